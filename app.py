@@ -2,19 +2,15 @@
 AHU Psychrometric Design Tool — Streamlit App
 Zutari Infrastructure Engineering
 """
-import io
-import matplotlib
-matplotlib.use("Agg")
-
 import streamlit as st
 import plotly.graph_objects as go
 import psychrolib
 import numpy as np
+import pandas as pd
 
-from psychro import AirState, altitude_to_pressure, saturation_curve, rh_curve, enthalpy_line, wb_line
+from psychro import (AirState, altitude_to_pressure, saturation_curve, rh_curve, enthalpy_line, wb_line,
+                     ASHRAE_ZONES, ashrae_zone_polygon)
 from psychro_engine import derive_off_coil, compute_system_flows, compute_processes, process_to_dict, ASHRAE_A1
-from weather_live import get_design_conditions_for_city, design_conditions_to_dict
-from excel_export import build_excel
 
 psychrolib.SetUnitSystem(psychrolib.SI)
 
@@ -26,7 +22,7 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-st.markdown("""
+CSS_BLOCK = """
 <style>
     .block-container { padding-top: 1rem; padding-bottom: 1rem; }
     .stMetric { background: #1e2230; border-radius: 8px; padding: 8px; }
@@ -38,7 +34,9 @@ st.markdown("""
         font-weight: 600; color: #cccccc;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+# Re-emitted every run: Streamlit drops elements a rerun does not write again
+st.markdown(CSS_BLOCK, unsafe_allow_html=True)
 
 # ── Defaults ──────────────────────────────────────────────────────────────────
 DEFAULTS = {
@@ -66,6 +64,11 @@ for k, v in DEFAULTS.items():
     if k not in st.session_state:
         st.session_state[k] = v
 
+# Fetched weather values are staged by the sidebar button and applied here,
+# before the widgets bound to those keys are created
+for k, v in st.session_state.pop("_weather_update", {}).items():
+    st.session_state[k] = v
+
 # ── Colours ───────────────────────────────────────────────────────────────────
 C = {
     "ASHRAE": "#2ecc71", "CRAH": "#e74c3c", "OUTDOOR": "#f39c12",
@@ -73,6 +76,11 @@ C = {
     "RH_LINE": "rgba(150,150,150,0.35)", "ENTH_LINE": "rgba(100,180,255,0.20)",
     "WB_LINE": "rgba(200,200,100,0.20)", "ASHRAE_ZONE": "rgba(46,204,113,0.10)",
 }
+ZONE_STYLES = {  # ASHRAE zone → (fill, line colour, dash)
+    "A3/A4":       ("rgba(46,204,113,0.08)", "#27ae60", "dash"),
+    "A1/A2":       ("rgba(52,152,219,0.10)", "#2980b9", "dash"),
+    "Recommended": ("rgba(231,76,60,0.12)",  "#e74c3c", "solid"),
+}
 POINT_GROUPS = {
     "ASHRAE 18 Low":  ("ASHRAE A1 Zone", C["ASHRAE"],   "diamond"),
     "ASHRAE 18 High": ("ASHRAE A1 Zone", C["ASHRAE"],   "diamond"),
@@ -92,111 +100,185 @@ POINT_GROUPS = {
     "Return Air":     ("Return Air",     C["RETURN"],   "triangle-up"),
 }
 
+# State names per legend group (in POINT_GROUPS order), so each group is one trace
+GROUP_MEMBERS = {}
+for _name, (_grp, _col, _sym) in POINT_GROUPS.items():
+    GROUP_MEMBERS.setdefault(_grp, []).append(_name)
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 def get_inp():
     return {k: st.session_state[k] for k in DEFAULTS}
 
+# State points and system flows are pure functions of the inputs, so reruns
+# that leave them unchanged reuse the previous results.
 def compute_states(inp):
-    P = altitude_to_pressure(inp["altitude"])
-    return P, {
-        "ASHRAE 18 Low":  AirState("ASHRAE 18 Low",  18.0, inp["ash_twb_low"],      P),
-        "ASHRAE 18 High": AirState("ASHRAE 18 High", 18.0, inp["ash_twb_high"],     P),
-        "ASHRAE 27 Low":  AirState("ASHRAE 27 Low",  27.0, inp["ash_twb_27_low"],   P),
-        "ASHRAE 27 High": AirState("ASHRAE 27 High", 27.0, inp["ash_twb_27_high"],  P),
-        "CRAH Off-Coil":  AirState("CRAH Off-Coil",  inp["crah_off_tdb"], inp["crah_off_twb"], P),
-        "CRAH On-Coil":   AirState("CRAH On-Coil",   inp["crah_on_tdb"],  inp["crah_on_twb"],  P),
-        "OAT Max N=20":   AirState("OAT Max N=20",   inp["oat_n20_tdb"],  inp["oat_n20_twb"],  P),
-        "OAT Max 0.4%E":  AirState("OAT Max 0.4%E",  inp["oat_04e_tdb"],  inp["oat_04e_twb"],  P),
-        "OAT Max 0.4%H":  AirState("OAT Max 0.4%H",  inp["oat_04h_tdb"],  inp["oat_04h_twb"],  P),
-        "OAT Min N=20":   AirState("OAT Min N=20",   inp["oat_min_n20_tdb"], inp["oat_min_n20_twb"], P),
-        "OAT Min 0.4%H":  AirState("OAT Min 0.4%H",  inp["oat_min_04h_tdb"], inp["oat_min_04h_twb"], P),
-        "OC Max Cool":    AirState("OC Max Cool",    inp["oc_cool_tdb"],  inp["oc_cool_twb"],  P),
-        "OC Enthalpy":    AirState("OC Enthalpy",    inp["oc_enth_tdb"],  inp["oc_enth_twb"],  P),
-        "OC Dehum":       AirState("OC Dehum",       inp["oc_dehum_tdb"], inp["oc_dehum_twb"], P),
-        "OC Heat":        AirState("OC Heat",        inp["oc_heat_tdb"],  inp["oc_heat_twb"],  P),
-        "Return Air":     AirState("Return Air",     inp["ra_tdb"],       inp["ra_twb"],       P),
-    }
+    points = [
+        ("ASHRAE 18 Low",  18.0,                   inp["ash_twb_low"]),
+        ("ASHRAE 18 High", 18.0,                   inp["ash_twb_high"]),
+        ("ASHRAE 27 Low",  27.0,                   inp["ash_twb_27_low"]),
+        ("ASHRAE 27 High", 27.0,                   inp["ash_twb_27_high"]),
+        ("CRAH Off-Coil",  inp["crah_off_tdb"],    inp["crah_off_twb"]),
+        ("CRAH On-Coil",   inp["crah_on_tdb"],     inp["crah_on_twb"]),
+        ("OAT Max N=20",   inp["oat_n20_tdb"],     inp["oat_n20_twb"]),
+        ("OAT Max 0.4%E",  inp["oat_04e_tdb"],     inp["oat_04e_twb"]),
+        ("OAT Max 0.4%H",  inp["oat_04h_tdb"],     inp["oat_04h_twb"]),
+        ("OAT Min N=20",   inp["oat_min_n20_tdb"], inp["oat_min_n20_twb"]),
+        ("OAT Min 0.4%H",  inp["oat_min_04h_tdb"], inp["oat_min_04h_twb"]),
+        ("OC Max Cool",    inp["oc_cool_tdb"],     inp["oc_cool_twb"]),
+        ("OC Enthalpy",    inp["oc_enth_tdb"],     inp["oc_enth_twb"]),
+        ("OC Dehum",       inp["oc_dehum_tdb"],    inp["oc_dehum_twb"]),
+        ("OC Heat",        inp["oc_heat_tdb"],     inp["oc_heat_twb"]),
+        ("Return Air",     inp["ra_tdb"],          inp["ra_twb"]),
+    ]
+    names, tdbs, twbs = zip(*points)
+    return _compute_states(inp["altitude"], names, tdbs, twbs)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _compute_states(altitude, names, tdbs, twbs):
+    P = altitude_to_pressure(altitude)
+    return P, dict(zip(names, AirState.from_arrays(names, tdbs, twbs, P)))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _system_flows(P, it_load, ahu_vol_flow, crah_off_tdb, crah_off_twb,
+                  crah_on_tdb, crah_on_twb, oc_dehum_tdb, oc_dehum_twb):
+    return compute_system_flows(
+        it_load_kw=it_load, ahu_vol_flow_override=ahu_vol_flow,
+        crah_off_tdb=crah_off_tdb, crah_off_twb=crah_off_twb,
+        crah_on_tdb=crah_on_tdb,   crah_on_twb=crah_on_twb,
+        oc_dehum_tdb=oc_dehum_tdb, oc_dehum_twb=oc_dehum_twb, P=P,
+    )
+
+def system_flows(inp, P):
+    return _system_flows(P, inp["it_load"], inp["ahu_vol_flow"],
+                         inp["crah_off_tdb"], inp["crah_off_twb"],
+                         inp["crah_on_tdb"], inp["crah_on_twb"],
+                         inp["oc_dehum_tdb"], inp["oc_dehum_twb"])
+
+# Background curves depend only on pressure and the fixed axis extents, so
+# they are cached across reruns and rebuilt only when altitude changes.
+# N_CURVE samples per line is visually smooth at the chart's size.
+N_CURVE = 80
+RH_LEVELS = [.1, .2, .3, .4, .5, .6, .7, .8, .9]
+H_LEVELS  = list(range(0, 120, 10))
+
+@st.cache_data(show_spinner=False)
+def _sat(P, tmin, tmax):
+    return saturation_curve(P, tmin, tmax, n=N_CURVE)
+
+@st.cache_data(show_spinner=False)
+def _rh_all(P, tmin, tmax, wmax):
+    # Whole family on one shared temperature grid: W has one row per RH level
+    tv, W = rh_curve(np.array(RH_LEVELS)[:, None], P, tmin, tmax, n=N_CURVE)
+    curves = []
+    for rh, wv in zip(RH_LEVELS, W):
+        m = np.isfinite(wv) & (wv <= wmax)
+        if not m.any(): continue
+        curves.append((rh, tv[m], wv[m]))
+    return curves
+
+@st.cache_data(show_spinner=False)
+def _enth_all(P, tmin, tmax, wmax):
+    tv, W = enthalpy_line(np.array(H_LEVELS)[:, None], P, tmin, tmax, n=N_CURVE)
+    curves = []
+    for h, wv in zip(H_LEVELS, W):
+        m = np.isfinite(wv) & (wv >= 0) & (wv <= wmax)
+        if not m.any(): continue
+        curves.append((h, tv[m], wv[m]))
+    return curves
+
+@st.cache_data(show_spinner=False)
+def _wb_all(P, tmax, wmax):
+    curves = []
+    for wb in range(5, 35, 5):
+        tv, wv = wb_line(wb, P, wb, tmax, n=N_CURVE)
+        m = np.isfinite(wv) & (wv <= wmax)
+        if not m.any(): continue
+        curves.append((wb, tv[m], wv[m]))
+    return curves
+
+@st.cache_data(show_spinner=False)
+def _zones(P):
+    zones = []
+    for zone_name, *limits in ASHRAE_ZONES:
+        zx, zy = ashrae_zone_polygon(*limits, P)
+        if len(zx):
+            zones.append((zone_name, zx, zy))
+    return zones
+
+def _nan_join(curves, customdata=False):
+    """Join (value, x, y) curves into one NaN-separated x/y pair for a single trace.
+    With customdata=True each curve's value is also carried along for hover text;
+    otherwise the third item is None."""
+    xs, ys, cs = [], [], []
+    for val, tx, wx in curves:
+        xs += [tx, [np.nan]]
+        ys += [wx, [np.nan]]
+        if customdata:
+            cs += [np.full(len(tx) + 1, val)]
+    if not xs:
+        return np.array([]), np.array([]), (np.array([]) if customdata else None)
+    return np.concatenate(xs), np.concatenate(ys), (np.concatenate(cs) if customdata else None)
+
+# Chart extents and the input-independent part of the layout
+TDB_MIN, TDB_MAX, W_MAX = -10, 55, 32
+CHART_LAYOUT = dict(
+    template="plotly_dark", paper_bgcolor="#0f1117", plot_bgcolor="#0f1117",
+    font=dict(family="Inter,Arial", size=11, color="#cccccc"),
+    xaxis=dict(title="Dry Bulb Temperature [°C]", range=[TDB_MIN, TDB_MAX],
+               showgrid=True, gridcolor="#1e2230", dtick=5, ticksuffix="°C"),
+    yaxis=dict(title="Humidity Ratio [g/kg dry air]", range=[0, W_MAX],
+               showgrid=True, gridcolor="#1e2230", dtick=2, ticksuffix=" g/kg", side="right"),
+    legend=dict(bgcolor="rgba(15,17,23,0.85)", bordercolor="#2a2d3e", borderwidth=1,
+                font=dict(size=10), x=0.01, y=0.99, xanchor="left", yanchor="top"),
+    margin=dict(l=60, r=120, t=60, b=60), height=700, hovermode="closest",
+    uirevision="psychro",  # keep the user's zoom/pan and legend toggles across updates
+)
+
+# Client-side Plotly config: no logo, and no selection tools (the chart has no selection handling)
+CHART_CONFIG = dict(displaylogo=False,
+                    modeBarButtonsToRemove=["select2d", "lasso2d", "autoScale2d"])
 
 def build_chart(inp, states, P):
-    fig = go.Figure()
-    tdb_min, tdb_max, w_max = -10, 55, 32
+    traces, annotations = [], []
+    tdb_min, tdb_max, w_max = TDB_MIN, TDB_MAX, W_MAX
 
-    t_sat, w_sat = saturation_curve(P, tdb_min, tdb_max)
-    fig.add_trace(go.Scatter(x=t_sat, y=w_sat, mode="lines",
+    t_sat, w_sat = _sat(P, tdb_min, tdb_max)
+    traces.append(dict(type="scattergl", x=t_sat, y=w_sat, mode="lines",
         line=dict(color=C["SAT_CURVE"], width=2.5), name="Saturation (100% RH)",
-        hovertemplate="Tdb: %{x:.1f}°C | W: %{y:.2f} g/kg<extra>Saturation</extra>"))
+        hoverinfo="skip"))
 
     if inp.get("show_rh_lines"):
-        for i, rh in enumerate([.1,.2,.3,.4,.5,.6,.7,.8,.9]):
-            tv, wv = rh_curve(rh, P, tdb_min, tdb_max)
-            v = [(t,w) for t,w in zip(tv,wv) if w is not None and w <= w_max]
-            if not v: continue
-            tx, wx = zip(*v)
-            fig.add_trace(go.Scatter(x=tx, y=wx, mode="lines",
-                line=dict(color=C["RH_LINE"], width=0.8, dash="dot"),
-                name="RH Lines" if i==0 else None, legendgroup="rh", showlegend=(i==0),
-                hovertemplate=f"RH={rh*100:.0f}%<br>%{{x:.1f}}°C / %{{y:.2f}} g/kg<extra></extra>"))
+        rh_curves = _rh_all(P, tdb_min, tdb_max, w_max)
+        xs, ys, _ = _nan_join(rh_curves)
+        traces.append(dict(type="scattergl", x=xs, y=ys, mode="lines",
+            line=dict(color=C["RH_LINE"], width=0.8, dash="dot"),
+            name="RH Lines", legendgroup="rh", hoverinfo="skip"))
+        for rh, tx, wx in rh_curves:
             mid = len(tx)//2
-            fig.add_annotation(x=tx[mid], y=wx[mid], text=f"{rh*100:.0f}%",
-                font=dict(size=9, color="#666"), showarrow=False, xanchor="left", yanchor="bottom")
+            annotations.append(dict(x=tx[mid], y=wx[mid], text=f"{rh*100:.0f}%",
+                font=dict(size=9, color="#666"), showarrow=False, xanchor="left", yanchor="bottom"))
 
     if inp.get("show_enth_lines"):
-        for i, h in enumerate(range(0, 120, 10)):
-            tv, wv = enthalpy_line(h, P, tdb_min, tdb_max)
-            v = [(t,w) for t,w in zip(tv,wv) if w is not None and 0 <= w <= w_max]
-            if not v: continue
-            tx, wx = zip(*v)
-            fig.add_trace(go.Scatter(x=tx, y=wx, mode="lines",
-                line=dict(color=C["ENTH_LINE"], width=0.6),
-                name="Enthalpy Lines" if i==0 else None, legendgroup="enth", showlegend=(i==0),
-                hovertemplate=f"h={h} kJ/kg<br>%{{x:.1f}}°C / %{{y:.2f}} g/kg<extra></extra>"))
+        enth_curves = _enth_all(P, tdb_min, tdb_max, w_max)
+        xs, ys, _ = _nan_join(enth_curves)
+        traces.append(dict(type="scattergl", x=xs, y=ys, mode="lines",
+            line=dict(color=C["ENTH_LINE"], width=0.6),
+            name="Enthalpy Lines", legendgroup="enth", hoverinfo="skip"))
+        for h, tx, wx in enth_curves:
             if wx[-1] <= w_max:
-                fig.add_annotation(x=tx[-1], y=wx[-1], text=f"{h}",
-                    font=dict(size=8, color="#336699"), showarrow=False, xanchor="left")
+                annotations.append(dict(x=tx[-1], y=wx[-1], text=f"{h}",
+                    font=dict(size=8, color="#336699"), showarrow=False, xanchor="left"))
 
     if inp.get("show_wb_lines"):
-        for i, wb in enumerate(range(5, 35, 5)):
-            tv, wv = wb_line(wb, P, wb, tdb_max)
-            v = [(t,w) for t,w in zip(tv,wv) if w is not None and w <= w_max]
-            if not v: continue
-            tx, wx = zip(*v)
-            fig.add_trace(go.Scatter(x=tx, y=wx, mode="lines",
-                line=dict(color=C["WB_LINE"], width=0.7, dash="longdash"),
-                name="WB Lines" if i==0 else None, legendgroup="wb", showlegend=(i==0)))
+        xs, ys, _ = _nan_join(_wb_all(P, tdb_max, w_max))
+        traces.append(dict(type="scattergl", x=xs, y=ys, mode="lines",
+            line=dict(color=C["WB_LINE"], width=0.7, dash="longdash"),
+            name="WB Lines", legendgroup="wb", hoverinfo="skip"))
 
     if inp.get("show_ashrae"):
-        import psychrolib as _psl
-        _psl.SetUnitSystem(_psl.SI)
-
-        def _ashrae_zone_polygon(tmin, tmax, rh_lo, rh_hi, dp_min_c, dp_max_c, P, n=300):
-            """Compute ASHRAE zone polygon clipped by both RH curves and dew-point lines."""
-            t = np.linspace(tmin, tmax, n)
-            lower_rh = np.array([_psl.GetHumRatioFromRelHum(ti, rh_lo, P)*1000 for ti in t])
-            upper_rh = np.array([_psl.GetHumRatioFromRelHum(ti, rh_hi, P)*1000 for ti in t])
-            dp_lo_w  = _psl.GetHumRatioFromTDewPoint(dp_min_c, P) * 1000
-            dp_hi_w  = _psl.GetHumRatioFromTDewPoint(dp_max_c, P) * 1000
-            lower = np.maximum(lower_rh, dp_lo_w)
-            upper = np.minimum(upper_rh, dp_hi_w)
-            valid = upper > lower
-            t, lower, upper = t[valid], lower[valid], upper[valid]
-            if len(t) < 2:
-                return [], []
-            px = list(t) + list(t[::-1])
-            py = list(lower) + list(upper[::-1])
-            return px, py
-
-        # ASHRAE TC9.9 2021 zone definitions
-        # (tdb_min, tdb_max, rh_lower, rh_upper, dp_min_°C, dp_max_°C)
-        ASHRAE_ZONES = [
-            ("A3/A4",        5,  40, 0.08, 0.85, -12, 24, "rgba(46,204,113,0.08)",  "#27ae60", "dash"),
-            ("A1/A2",        15, 32, 0.08, 0.80, -12, 17, "rgba(52,152,219,0.10)",  "#2980b9", "dash"),
-            ("Recommended",  18, 27, 0.08, 0.60, -9,  15, "rgba(231,76,60,0.12)",   "#e74c3c", "solid"),
-        ]
-        for zone_name, tmin, tmax, rh_lo, rh_hi, dp_min, dp_max, fill, line_col, dash in ASHRAE_ZONES:
-            zx, zy = _ashrae_zone_polygon(tmin, tmax, rh_lo, rh_hi, dp_min, dp_max, P)
-            if not zx:
-                continue
-            fig.add_trace(go.Scatter(x=zx, y=zy, fill="toself", fillcolor=fill,
+        for zone_name, zx, zy in _zones(P):
+            fill, line_col, dash = ZONE_STYLES[zone_name]
+            traces.append(dict(type="scatter", x=zx, y=zy, fill="toself", fillcolor=fill,
                 line=dict(color=line_col, width=1.5, dash=dash),
                 name=f"ASHRAE {zone_name}", legendgroup="ashrae",
                 hovertemplate=f"<b>ASHRAE {zone_name}</b><br>Tdb: %{{x:.1f}}°C<br>W: %{{y:.2f}} g/kg<extra></extra>"))
@@ -211,44 +293,83 @@ def build_chart(inp, states, P):
             ("CRAH On-Coil",  "CRAH Off-Coil",C["CRAH"],     "CRAH Process"),
             ("Return Air",    "CRAH On-Coil", C["RETURN"],   "Return→CRAH"),
         ]
-        for i, (a, b, col, lbl) in enumerate(pairs):
+        # One trace per line colour; pairs are NaN-separated within it
+        by_col = {}
+        for a, b, col, lbl in pairs:
             p1, p2 = states[a], states[b]
-            fig.add_trace(go.Scatter(x=[p1.tdb, p2.tdb], y=[p1.w_gkg, p2.w_gkg],
+            by_col.setdefault(col, []).append((lbl, [p1.tdb, p2.tdb], [p1.w_gkg, p2.w_gkg]))
+        for i, (col, segs) in enumerate(by_col.items()):
+            xs, ys, cs = _nan_join(segs, customdata=True)
+            traces.append(dict(type="scatter", x=xs, y=ys, customdata=cs,
                 mode="lines+markers", line=dict(color=col, width=1.2, dash="dot"),
                 marker=dict(symbol="arrow", size=10, color=col, angleref="previous"),
                 name="Processes" if i==0 else None, legendgroup="proc", showlegend=(i==0),
-                hovertemplate=f"{lbl}<br>%{{x:.1f}}°C / %{{y:.2f}} g/kg<extra></extra>"))
-
-    added = set()
-    for name, st_obj in states.items():
-        grp, col, sym = POINT_GROUPS.get(name, ("Other", "#fff", "circle"))
-        sl = grp not in added
-        added.add(grp)
-        hover = (f"<b>{name}</b><br>Tdb:{st_obj.tdb:.1f}°C Twb:{st_obj.twb:.1f}°C<br>"
-                 f"RH:{st_obj.rh*100:.1f}% W:{st_obj.w_gkg:.2f}g/kg<br>"
-                 f"h:{st_obj.h:.2f}kJ/kg Tdp:{st_obj.tdp:.1f}°C ρ:{st_obj.density:.3f}kg/m³")
-        fig.add_trace(go.Scatter(x=[st_obj.tdb], y=[st_obj.w_gkg], mode="markers+text",
-            marker=dict(symbol=sym, size=12, color=col, line=dict(width=1.5, color="#fff")),
-            text=[name], textposition="top center", textfont=dict(size=9, color=col),
-            name=grp, legendgroup=grp, showlegend=sl,
-            hovertemplate=hover+"<extra></extra>"))
-
-    fig.update_layout(
-        template="plotly_dark", paper_bgcolor="#0f1117", plot_bgcolor="#0f1117",
-        font=dict(family="Inter,Arial", size=11, color="#cccccc"),
-        title=dict(
+                hovertemplate="%{customdata}<br>%{x:.1f}°C / %{y:.2f} g/kg<extra></extra>"))
+
+    for grp, names in GROUP_MEMBERS.items():
+        names = [n for n in names if n in states]
+        if not names: continue
+        pts = [states[n] for n in names]
+        col = POINT_GROUPS[names[0]][1]
+        hover = [(f"<b>{n}</b><br>Tdb:{s.tdb:.1f}°C Twb:{s.twb:.1f}°C<br>"
+                  f"RH:{s.rh*100:.1f}% W:{s.w_gkg:.2f}g/kg<br>"
+                  f"h:{s.h:.2f}kJ/kg Tdp:{s.tdp:.1f}°C ρ:{s.density:.3f}kg/m³")
+                 for n, s in zip(names, pts)]
+        traces.append(dict(type="scatter", x=[s.tdb for s in pts], y=[s.w_gkg for s in pts], mode="markers+text",
+            marker=dict(symbol=[POINT_GROUPS[n][2] for n in names], size=12, color=col,
+                        line=dict(width=1.5, color="#fff")),
+            text=names, textposition="top center", textfont=dict(size=9, color=col),
+            name=grp, legendgroup=grp, hovertext=hover,
+            hovertemplate="%{hovertext}<extra></extra>"))
+
+    return go.Figure(data=traces, layout={
+        **CHART_LAYOUT,
+        "title": dict(
             text=(f"<b>Psychrometric Chart</b> — {inp.get('city','')} | "
                   f"Alt:{float(inp.get('altitude',0)):.0f}m | "
                   f"P:{P/1000:.2f}kPa | IT:{float(inp.get('it_load',0)):.0f}kW"),
             font=dict(size=14, color="#00c3ff"), x=0.0, xanchor="left"),
-        xaxis=dict(title="Dry Bulb Temperature [°C]", range=[tdb_min, tdb_max],
-                   showgrid=True, gridcolor="#1e2230", dtick=5, ticksuffix="°C"),
-        yaxis=dict(title="Humidity Ratio [g/kg dry air]", range=[0, w_max],
-                   showgrid=True, gridcolor="#1e2230", dtick=2, ticksuffix=" g/kg", side="right"),
-        legend=dict(bgcolor="rgba(15,17,23,0.85)", bordercolor="#2a2d3e", borderwidth=1,
-                    font=dict(size=10), x=0.01, y=0.99, xanchor="left", yanchor="top"),
-        margin=dict(l=60, r=120, t=60, b=60), height=700, hovermode="closest")
-    return fig
+        "annotations": annotations,
+    })
+
+# Built figures are reused for identical inputs; the key holds every value
+# build_chart reads (state points, title fields and display toggles).
+SHOW_KEYS = ("show_rh_lines", "show_enth_lines", "show_wb_lines", "show_ashrae", "show_processes")
+
+def chart_key(inp, states, P):
+    return (P, tuple((n, s.tdb, s.twb) for n, s in states.items()),
+            inp.get("city"), inp.get("altitude"), inp.get("it_load"),
+            tuple(bool(inp.get(k)) for k in SHOW_KEYS))
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def get_fig(key, _inp, _states, P):
+    return build_chart(_inp, _states, P)
+
+# The workbook depends only on the design inputs (not the display toggles),
+# so its bytes are cached and rebuilt only when an input changes.
+@st.cache_data(show_spinner=False, max_entries=8)
+def excel_bytes(design_inp):
+    from excel_export import build_excel
+    P, states = compute_states(design_inp)
+    return build_excel(design_inp, None, states, P)
+
+# Chart display toggles live inside a fragment with the chart, so flipping one
+# only reruns this block rather than the whole script.
+@st.fragment
+def render_chart(states, P):
+    with st.expander("🎨 Chart Options", expanded=False):
+        c1, c2, c3, c4, c5 = st.columns(5)
+        c1.toggle("Show ASHRAE Zones (Recommended / A1·A2 / A3·A4)", key="show_ashrae")
+        c2.toggle("Show Process Lines", key="show_processes")
+        c3.toggle("Show RH Curves", key="show_rh_lines")
+        c4.toggle("Show Enthalpy Lines", key="show_enth_lines")
+        c5.toggle("Show Wet Bulb Lines", key="show_wb_lines")
+    try:
+        inp = get_inp()
+        fig = get_fig(chart_key(inp, states, P), inp, states, P)
+        st.plotly_chart(fig, width="stretch", config=CHART_CONFIG, key="psychro_chart")
+    except Exception as e:
+        st.error(f"Chart error: {e}")
 
 # ── Sidebar ───────────────────────────────────────────────────────────────────
 with st.sidebar:
@@ -258,19 +379,22 @@ with st.sidebar:
 
     # ── Project ───────────────────────────────────────────────────────────────
     st.markdown('<div class="section-header">📋 Project & Location</div>', unsafe_allow_html=True)
-    st.session_state["city"]         = st.text_input("City / Location", value=st.session_state["city"])
-    st.session_state["altitude"]     = st.number_input("Altitude (m)", value=float(st.session_state["altitude"]), min_value=0.0, max_value=3000.0, step=1.0)
-    st.session_state["it_load"]      = st.number_input("IT Load (kW)", value=float(st.session_state["it_load"]), min_value=100.0, max_value=20000.0, step=50.0)
-    st.session_state["ahu_vol_flow"] = st.number_input("AHU Volume Flow (m³/s)", value=float(st.session_state["ahu_vol_flow"]), min_value=0.1, max_value=20.0, step=0.005, format="%.3f")
-
-    # Weather fetch
-    if st.button("🌍 Fetch Weather Data", use_container_width=True):
+    with st.form("form_project", border=False):
+        st.text_input("City / Location", key="city")
+        st.number_input("Altitude (m)", min_value=0.0, max_value=3000.0, step=1.0, key="altitude")
+        st.number_input("IT Load (kW)", min_value=100.0, max_value=20000.0, step=50.0, key="it_load")
+        st.number_input("AHU Volume Flow (m³/s)", min_value=0.1, max_value=20.0, step=0.005, format="%.3f", key="ahu_vol_flow")
+        st.form_submit_button("Apply", width="stretch")
+        fetch_weather = st.form_submit_button("🌍 Fetch Weather Data", width="stretch")
+
+    # Weather fetch — submitted from the project form, so a newly typed city is
+    # committed to session state before it is looked up
+    if fetch_weather:
         with st.spinner(f"Fetching ERA5 data for {st.session_state['city']}..."):
             try:
+                from weather_live import get_design_conditions_for_city, design_conditions_to_dict
                 dc = design_conditions_to_dict(get_design_conditions_for_city(st.session_state["city"]))
-                for k, v in dc.items():
-                    if k in st.session_state:
-                        st.session_state[k] = v
+                st.session_state["_weather_update"] = {k: float(v) for k, v in dc.items() if k in DEFAULTS}
                 st.success(f"✅ Weather data loaded for {st.session_state['city']}")
                 st.rerun()
             except Exception as e:
@@ -280,105 +404,108 @@ with st.sidebar:
 
     # ── Outdoor Design ────────────────────────────────────────────────────────
     with st.expander("☀️ Outdoor Design Conditions", expanded=False):
-        st.caption("Summer Cooling")
-        c1, c2 = st.columns(2)
-        with c1:
-            st.session_state["oat_n20_tdb"]  = st.number_input("N=20 Tdb (°C)",  value=float(st.session_state["oat_n20_tdb"]),  step=0.1, key="oat_n20_tdb_in")
-            st.session_state["oat_04e_tdb"]  = st.number_input("0.4%E Tdb (°C)", value=float(st.session_state["oat_04e_tdb"]),  step=0.1, key="oat_04e_tdb_in")
-            st.session_state["oat_04h_tdb"]  = st.number_input("0.4%H Tdb (°C)", value=float(st.session_state["oat_04h_tdb"]),  step=0.1, key="oat_04h_tdb_in")
-        with c2:
-            st.session_state["oat_n20_twb"]  = st.number_input("N=20 Twb (°C)",  value=float(st.session_state["oat_n20_twb"]),  step=0.1, key="oat_n20_twb_in")
-            st.session_state["oat_04e_twb"]  = st.number_input("0.4%E Twb (°C)", value=float(st.session_state["oat_04e_twb"]),  step=0.1, key="oat_04e_twb_in")
-            st.session_state["oat_04h_twb"]  = st.number_input("0.4%H Twb (°C)", value=float(st.session_state["oat_04h_twb"]),  step=0.1, key="oat_04h_twb_in")
-        st.caption("Winter Heating")
-        c1, c2 = st.columns(2)
-        with c1:
-            st.session_state["oat_min_n20_tdb"] = st.number_input("Min N=20 Tdb (°C)",  value=float(st.session_state["oat_min_n20_tdb"]), step=0.1, key="oat_min_n20_tdb_in")
-            st.session_state["oat_min_04h_tdb"] = st.number_input("Min 0.4%H Tdb (°C)", value=float(st.session_state["oat_min_04h_tdb"]), step=0.1, key="oat_min_04h_tdb_in")
-        with c2:
-            st.session_state["oat_min_n20_twb"] = st.number_input("Min N=20 Twb (°C)",  value=float(st.session_state["oat_min_n20_twb"]), step=0.1, key="oat_min_n20_twb_in")
-            st.session_state["oat_min_04h_twb"] = st.number_input("Min 0.4%H Twb (°C)", value=float(st.session_state["oat_min_04h_twb"]), step=0.1, key="oat_min_04h_twb_in")
+        with st.form("form_outdoor", border=False):
+            st.caption("Summer Cooling")
+            c1, c2 = st.columns(2)
+            with c1:
+                st.number_input("N=20 Tdb (°C)",  step=0.1, key="oat_n20_tdb")
+                st.number_input("0.4%E Tdb (°C)", step=0.1, key="oat_04e_tdb")
+                st.number_input("0.4%H Tdb (°C)", step=0.1, key="oat_04h_tdb")
+            with c2:
+                st.number_input("N=20 Twb (°C)",  step=0.1, key="oat_n20_twb")
+                st.number_input("0.4%E Twb (°C)", step=0.1, key="oat_04e_twb")
+                st.number_input("0.4%H Twb (°C)", step=0.1, key="oat_04h_twb")
+            st.caption("Winter Heating")
+            c1, c2 = st.columns(2)
+            with c1:
+                st.number_input("Min N=20 Tdb (°C)",  step=0.1, key="oat_min_n20_tdb")
+                st.number_input("Min 0.4%H Tdb (°C)", step=0.1, key="oat_min_04h_tdb")
+            with c2:
+                st.number_input("Min N=20 Twb (°C)",  step=0.1, key="oat_min_n20_twb")
+                st.number_input("Min 0.4%H Twb (°C)", step=0.1, key="oat_min_04h_twb")
+            st.form_submit_button("Apply", width="stretch")
 
     # ── CRAH Setpoints ────────────────────────────────────────────────────────
     with st.expander("❄️ CRAH Setpoints", expanded=True):
-        st.caption("CRAH Off-Coil (Supply to Cold Aisle)")
-        c1, c2 = st.columns(2)
-        with c1:
-            st.session_state["crah_off_tdb"] = st.number_input("Off-Coil Tdb (°C)", value=float(st.session_state["crah_off_tdb"]), min_value=15.0, max_value=35.0, step=0.1, key="crah_off_tdb_in")
-        with c2:
-            st.session_state["crah_off_twb"] = st.number_input("Off-Coil Twb (°C)", value=float(st.session_state["crah_off_twb"]), min_value=5.0,  max_value=30.0, step=0.1, key="crah_off_twb_in")
-        st.caption("CRAH On-Coil (Return from Hot Aisle)")
-        c1, c2 = st.columns(2)
-        with c1:
-            st.session_state["crah_on_tdb"] = st.number_input("On-Coil Tdb (°C)", value=float(st.session_state["crah_on_tdb"]), min_value=20.0, max_value=55.0, step=0.1, key="crah_on_tdb_in")
-        with c2:
-            st.session_state["crah_on_twb"] = st.number_input("On-Coil Twb (°C)", value=float(st.session_state["crah_on_twb"]), min_value=5.0,  max_value=35.0, step=0.1, key="crah_on_twb_in")
-        st.caption("Return Air")
-        c1, c2 = st.columns(2)
-        with c1:
-            st.session_state["ra_tdb"] = st.number_input("Return Air Tdb (°C)", value=float(st.session_state["ra_tdb"]), step=0.1, key="ra_tdb_in")
-        with c2:
-            st.session_state["ra_twb"] = st.number_input("Return Air Twb (°C)", value=float(st.session_state["ra_twb"]), step=0.1, key="ra_twb_in")
+        with st.form("form_crah", border=False):
+            st.caption("CRAH Off-Coil (Supply to Cold Aisle)")
+            c1, c2 = st.columns(2)
+            with c1:
+                st.number_input("Off-Coil Tdb (°C)", min_value=15.0, max_value=35.0, step=0.1, key="crah_off_tdb")
+            with c2:
+                st.number_input("Off-Coil Twb (°C)", min_value=5.0,  max_value=30.0, step=0.1, key="crah_off_twb")
+            st.caption("CRAH On-Coil (Return from Hot Aisle)")
+            c1, c2 = st.columns(2)
+            with c1:
+                st.number_input("On-Coil Tdb (°C)", min_value=20.0, max_value=55.0, step=0.1, key="crah_on_tdb")
+            with c2:
+                st.number_input("On-Coil Twb (°C)", min_value=5.0,  max_value=35.0, step=0.1, key="crah_on_twb")
+            st.caption("Return Air")
+            c1, c2 = st.columns(2)
+            with c1:
+                st.number_input("Return Air Tdb (°C)", step=0.1, key="ra_tdb")
+            with c2:
+                st.number_input("Return Air Twb (°C)", step=0.1, key="ra_twb")
+            st.form_submit_button("Apply", width="stretch")
 
     # ── AHU Off-Coil ──────────────────────────────────────────────────────────
     with st.expander("💨 AHU Off-Coil Conditions", expanded=False):
-        st.caption("Derive margins")
-        c1, c2, c3 = st.columns(3)
-        with c1:
-            st.session_state["oc_cool_margin"]  = st.number_input("Cool Margin (°C)",  value=float(st.session_state["oc_cool_margin"]),  min_value=0.0, max_value=10.0, step=0.5, key="oc_cool_margin_in")
-        with c2:
-            st.session_state["oc_dehum_margin"] = st.number_input("Dehum Margin (°C)", value=float(st.session_state["oc_dehum_margin"]), min_value=0.0, max_value=10.0, step=0.5, key="oc_dehum_margin_in")
-        with c3:
-            st.session_state["oc_enth_target"]  = st.number_input("Enth Target (kJ/kg)", value=float(st.session_state["oc_enth_target"]), min_value=30.0, max_value=60.0, step=1.0, key="oc_enth_target_in")
-
-        if st.button("⚡ Derive Off-Coil Conditions", use_container_width=True):
-            inp = get_inp()
-            P = altitude_to_pressure(inp["altitude"])
-            try:
-                d = derive_off_coil(
-                    crah_off_tdb=inp["crah_off_tdb"], crah_off_twb=inp["crah_off_twb"],
-                    crah_on_tdb=inp["crah_on_tdb"],
-                    oat_min_oah_tdb=inp["oat_min_04h_tdb"], oat_min_oah_twb=inp["oat_min_04h_twb"],
-                    oc_cool_margin=inp["oc_cool_margin"], oc_dehum_margin=inp["oc_dehum_margin"],
-                    oc_enth_target=inp["oc_enth_target"], P=P,
-                )
-                for k in ["oc_cool_tdb","oc_cool_twb","oc_enth_tdb","oc_enth_twb",
-                          "oc_dehum_tdb","oc_dehum_twb","oc_heat_tdb","oc_heat_twb"]:
-                    st.session_state[k] = d[k]
-                st.success(f"✅ CRAH DP={d['_crah_off_tdp']:.2f}°C  |  OC Cool={d['oc_cool_tdb']:.1f}°C  |  Dehum={d['oc_dehum_tdb']:.1f}°C")
-                st.rerun()
-            except Exception as e:
-                st.error(f"❌ {e}")
+        with st.form("form_oc_derive", border=False):
+            st.caption("Derive margins")
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                st.number_input("Cool Margin (°C)",  min_value=0.0, max_value=10.0, step=0.5, key="oc_cool_margin")
+            with c2:
+                st.number_input("Dehum Margin (°C)", min_value=0.0, max_value=10.0, step=0.5, key="oc_dehum_margin")
+            with c3:
+                st.number_input("Enth Target (kJ/kg)", min_value=30.0, max_value=60.0, step=1.0, key="oc_enth_target")
+            st.caption("Derives from the applied CRAH setpoints and Min 0.4%H outdoor "
+                       "condition — press Apply on those sections first.")
+
+            if st.form_submit_button("⚡ Derive Off-Coil Conditions", width="stretch"):
+                inp = get_inp()
+                P = altitude_to_pressure(inp["altitude"])
+                try:
+                    d = derive_off_coil(
+                        crah_off_tdb=inp["crah_off_tdb"], crah_off_twb=inp["crah_off_twb"],
+                        crah_on_tdb=inp["crah_on_tdb"],
+                        oat_min_oah_tdb=inp["oat_min_04h_tdb"], oat_min_oah_twb=inp["oat_min_04h_twb"],
+                        oc_cool_margin=inp["oc_cool_margin"], oc_dehum_margin=inp["oc_dehum_margin"],
+                        oc_enth_target=inp["oc_enth_target"], P=P,
+                    )
+                    for k in ["oc_cool_tdb","oc_cool_twb","oc_enth_tdb","oc_enth_twb",
+                              "oc_dehum_tdb","oc_dehum_twb","oc_heat_tdb","oc_heat_twb"]:
+                        st.session_state[k] = d[k]
+                    st.success(f"✅ CRAH DP={d['_crah_off_tdp']:.2f}°C  |  OC Cool={d['oc_cool_tdb']:.1f}°C  |  Dehum={d['oc_dehum_tdb']:.1f}°C")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ {e}")
 
         st.caption("Manual override values")
-        cols = st.columns(2)
-        labels = [
-            ("oc_cool_tdb","OC Cool Tdb"),("oc_cool_twb","OC Cool Twb"),
-            ("oc_enth_tdb","OC Enth Tdb"),("oc_enth_twb","OC Enth Twb"),
-            ("oc_dehum_tdb","OC Dehum Tdb"),("oc_dehum_twb","OC Dehum Twb"),
-            ("oc_heat_tdb","OC Heat Tdb"),("oc_heat_twb","OC Heat Twb"),
-        ]
-        for i, (k, lbl) in enumerate(labels):
-            with cols[i % 2]:
-                st.session_state[k] = st.number_input(f"{lbl} (°C)", value=float(st.session_state[k]), step=0.1, key=f"{k}_in")
+        with st.form("form_oc_manual", border=False):
+            cols = st.columns(2)
+            labels = [
+                ("oc_cool_tdb","OC Cool Tdb"),("oc_cool_twb","OC Cool Twb"),
+                ("oc_enth_tdb","OC Enth Tdb"),("oc_enth_twb","OC Enth Twb"),
+                ("oc_dehum_tdb","OC Dehum Tdb"),("oc_dehum_twb","OC Dehum Twb"),
+                ("oc_heat_tdb","OC Heat Tdb"),("oc_heat_twb","OC Heat Twb"),
+            ]
+            for i, (k, lbl) in enumerate(labels):
+                with cols[i % 2]:
+                    st.number_input(f"{lbl} (°C)", step=0.1, key=k)
+            st.form_submit_button("Apply", width="stretch")
 
     # ── ASHRAE A1 Zone ────────────────────────────────────────────────────────
     with st.expander("📐 ASHRAE A1 Zone", expanded=False):
-        c1, c2 = st.columns(2)
-        with c1:
-            st.session_state["ash_twb_low"]     = st.number_input("Lower WB @ 18°C", value=float(st.session_state["ash_twb_low"]),     step=0.1, key="ash_twb_low_in")
-            st.session_state["ash_twb_27_low"]  = st.number_input("Lower WB @ 27°C", value=float(st.session_state["ash_twb_27_low"]),  step=0.1, key="ash_twb_27_low_in")
-        with c2:
-            st.session_state["ash_twb_high"]    = st.number_input("Upper WB @ 18°C", value=float(st.session_state["ash_twb_high"]),    step=0.1, key="ash_twb_high_in")
-            st.session_state["ash_twb_27_high"] = st.number_input("Upper WB @ 27°C", value=float(st.session_state["ash_twb_27_high"]), step=0.1, key="ash_twb_27_high_in")
-
-    # ── Chart Options ─────────────────────────────────────────────────────────
-    with st.expander("🎨 Chart Options", expanded=False):
-        st.session_state["show_ashrae"]     = st.toggle("Show ASHRAE Zones (Recommended / A1·A2 / A3·A4)",  value=st.session_state["show_ashrae"])
-        st.session_state["show_processes"]  = st.toggle("Show Process Lines",   value=st.session_state["show_processes"])
-        st.session_state["show_rh_lines"]   = st.toggle("Show RH Curves",       value=st.session_state["show_rh_lines"])
-        st.session_state["show_enth_lines"] = st.toggle("Show Enthalpy Lines",  value=st.session_state["show_enth_lines"])
-        st.session_state["show_wb_lines"]   = st.toggle("Show Wet Bulb Lines",  value=st.session_state["show_wb_lines"])
+        with st.form("form_ashrae", border=False):
+            c1, c2 = st.columns(2)
+            with c1:
+                st.number_input("Lower WB @ 18°C", step=0.1, key="ash_twb_low")
+                st.number_input("Lower WB @ 27°C", step=0.1, key="ash_twb_27_low")
+            with c2:
+                st.number_input("Upper WB @ 18°C", step=0.1, key="ash_twb_high")
+                st.number_input("Upper WB @ 27°C", step=0.1, key="ash_twb_27_high")
+            st.form_submit_button("Apply", width="stretch")
 
 # ── Main area ─────────────────────────────────────────────────────────────────
 st.title("AHU Psychrometric Design")
@@ -392,47 +519,48 @@ except Exception as e:
     st.error(f"Error computing states: {e}")
     st.stop()
 
+# Flows feed both the System Flows and Process Loads tabs; each tab reports a failure itself
+try:
+    flows, flows_error = system_flows(inp, P), None
+except Exception as e:
+    flows, flows_error = None, e
+
 tab1, tab2, tab3, tab4 = st.tabs(["📊 Psychrometric Chart", "🌡️ Moist Air States", "💧 System Flows", "⚙️ Process Loads"])
 
 # ── Tab 1: Chart ──────────────────────────────────────────────────────────────
 with tab1:
-    try:
-        fig = build_chart(inp, states, P)
-        st.plotly_chart(fig, use_container_width=True)
-    except Exception as e:
-        st.error(f"Chart error: {e}")
-
-    # Excel download
-    try:
-        xlsx = build_excel(inp, None, states, P)
-        city_slug = inp["city"].replace(" ", "_")
-        st.download_button(
-            label="📥 Download Excel Report",
-            data=xlsx,
-            file_name=f"AHU_Design_{city_slug}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True,
-        )
-    except Exception as e:
-        st.warning(f"Excel export unavailable: {e}")
+    render_chart(states, P)
+
+    # Excel download — the workbook is only built once "Prepare" is pressed for
+    # the current design inputs; reruns after that reuse excel_bytes' cache
+    design_inp = {k: v for k, v in inp.items() if k not in SHOW_KEYS}
+    design_key = tuple(sorted(design_inp.items()))
+    if st.session_state.get("_xlsx_inputs") != design_key:
+        if st.button("📄 Prepare Excel Report", width="stretch"):
+            st.session_state["_xlsx_inputs"] = design_key
+    if st.session_state.get("_xlsx_inputs") == design_key:
+        try:
+            city_slug = inp["city"].replace(" ", "_")
+            st.download_button(
+                label="📥 Download Excel Report",
+                data=excel_bytes(design_inp),
+                file_name=f"AHU_Design_{city_slug}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                width="stretch",
+            )
+        except Exception as e:
+            del st.session_state["_xlsx_inputs"]
+            st.warning(f"Excel export unavailable: {e}")
 
 # ── Tab 2: Moist Air States ───────────────────────────────────────────────────
 with tab2:
-    import pandas as pd
-    rows = []
-    for name, s in states.items():
-        rows.append({
-            "State":      name,
-            "Tdb (°C)":   round(s.tdb,    1),
-            "Twb (°C)":   round(s.twb,    2),
-            "RH (%)":     round(s.rh*100, 1),
-            "W (g/kg)":   round(s.w_gkg,  3),
-            "h (kJ/kg)":  round(s.h,      2),
-            "Tdp (°C)":   round(s.tdp,    1),
-            "ρ (kg/m³)":  round(s.density,4),
-        })
-    df = pd.DataFrame(rows)
-    st.dataframe(df, use_container_width=True, hide_index=True,
+    props = np.array([[s.tdb, s.twb, s.rh*100, s.w_gkg, s.h, s.tdp, s.density]
+                      for s in states.values()])
+    decimals = {"Tdb (°C)": 1, "Twb (°C)": 2, "RH (%)": 1, "W (g/kg)": 3,
+                "h (kJ/kg)": 2, "Tdp (°C)": 1, "ρ (kg/m³)": 4}
+    df = pd.DataFrame(props, columns=list(decimals)).round(decimals)
+    df.insert(0, "State", list(states))
+    st.dataframe(df, width="stretch", hide_index=True,
                  column_config={
                      "Tdb (°C)":  st.column_config.NumberColumn(format="%.1f"),
                      "Twb (°C)":  st.column_config.NumberColumn(format="%.2f"),
@@ -447,12 +575,7 @@ with tab2:
 # ── Tab 3: System Flows ───────────────────────────────────────────────────────
 with tab3:
     try:
-        flows = compute_system_flows(
-            it_load_kw=inp["it_load"], ahu_vol_flow_override=inp["ahu_vol_flow"],
-            crah_off_tdb=inp["crah_off_tdb"], crah_off_twb=inp["crah_off_twb"],
-            crah_on_tdb=inp["crah_on_tdb"],   crah_on_twb=inp["crah_on_twb"],
-            oc_dehum_tdb=inp["oc_dehum_tdb"], oc_dehum_twb=inp["oc_dehum_twb"], P=P,
-        )
+        if flows_error: raise flows_error
         c1, c2, c3, c4 = st.columns(4)
         c1.metric("IT Load",              f"{inp['it_load']:.0f} kW")
         c2.metric("Total Sensible Load",  f"{flows.Q_sens_total:.1f} kW")
@@ -471,12 +594,7 @@ with tab3:
 # ── Tab 4: Process Loads ──────────────────────────────────────────────────────
 with tab4:
     try:
-        flows = compute_system_flows(
-            it_load_kw=inp["it_load"], ahu_vol_flow_override=inp["ahu_vol_flow"],
-            crah_off_tdb=inp["crah_off_tdb"], crah_off_twb=inp["crah_off_twb"],
-            crah_on_tdb=inp["crah_on_tdb"],   crah_on_twb=inp["crah_on_twb"],
-            oc_dehum_tdb=inp["oc_dehum_tdb"], oc_dehum_twb=inp["oc_dehum_twb"], P=P,
-        )
+        if flows_error: raise flows_error
         procs = compute_processes(inp, flows, P)
         proc_rows = []
         for p in procs:
@@ -494,8 +612,7 @@ with tab4:
                 "SHR":           p.SHR,
                 "Moisture (g/s)":p.moisture,
             })
-        import pandas as pd
         df2 = pd.DataFrame(proc_rows)
-        st.dataframe(df2, use_container_width=True, hide_index=True)
+        st.dataframe(df2, width="stretch", hide_index=True)
     except Exception as e:
         st.error(f"Process loads error: {e}")
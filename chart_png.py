@@ -10,12 +10,20 @@ Layout:
   - Saturation curve sweeping from bottom-left to top-right
 """
 import io
+import threading
+from functools import lru_cache
+
 import numpy as np
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.font_manager import FontProperties
+from PIL import Image
 import psychrolib
+from psychro import ASHRAE_ZONES, ashrae_zone_polygon, hum_ratio_from_rh, hum_ratio_from_twb
 
 psychrolib.SetUnitSystem(psychrolib.SI)
 
@@ -36,6 +44,8 @@ C = {
     "marker":         "#000000",     # all markers are black X like Excel
 }
 
+GRID_RGBA = {k: to_rgba(C[k]) for k in ("enth", "wb", "rh")}  # parsed once
+
 POINT_STYLES = {
     "ASHRAE 18 Low" : ("ASHRAE A1",    C["ashrae_a1"], "x", 60),
     "ASHRAE 18 High": ("ASHRAE A1",    C["ashrae_a1"], "x", 60),
@@ -55,6 +65,8 @@ POINT_STYLES = {
     "Return Air"    : ("Return Air",   "#000000",      "x", 70),
 }
 
+LABEL_FONT = FontProperties(family="Arial", size=6.8)  # shared by all state labels
+
 LABEL_MAP = {
     "ASHRAE 18 Low": None, "ASHRAE 18 High": None,
     "ASHRAE 27 Low": None, "ASHRAE 27 High": None,
@@ -73,36 +85,30 @@ LABEL_MAP = {
 }
 
 # ── Psychro helpers ───────────────────────────────────────────────────────────
-def _w_rh(t, rh, P):
-    try:    return psychrolib.GetHumRatioFromRelHum(t, rh, P) * 1000
-    except: return np.nan
-
-def _w_wb(t, twb, P):
-    try:    return psychrolib.GetHumRatioFromTWetBulb(t, twb, P) * 1000
-    except: return np.nan
-
 def _sat(P, t0, t1, n=500):
     ts = np.linspace(t0, t1, n)
-    ws = np.array([_w_rh(t, 1.0, P) for t in ts])
-    return ts, ws
+    return ts, hum_ratio_from_rh(ts, 1.0, P) * 1000
 
 def _rh_curve(rh, P, t0, t1, n=300):
     ts = np.linspace(t0, t1, n)
-    ws = np.array([_w_rh(t, rh, P) for t in ts])
-    return ts, ws
+    return ts, hum_ratio_from_rh(ts, rh, P) * 1000
 
 def _wb_line(twb, P, t0, t1, n=200):
     ts = np.linspace(max(t0, twb - 0.01), t1, n)
-    ws = np.array([_w_wb(t, twb, P) for t in ts])
-    return ts, ws
+    ws = hum_ratio_from_twb(ts, twb, P) * 1000
+    return ts, np.where(ts >= twb, ws, np.nan)  # wet bulb cannot exceed dry bulb
 
 def _enth_line(h, P, t0, t1, n=200):
     ts = np.linspace(t0, t1, n)
-    ws = []
-    for t in ts:
-        d = 2501 + 1.86*t
-        ws.append((h - 1.006*t)/d*1000 if abs(d) > 1e-6 else np.nan)
-    return ts, np.array(ws)
+    d = 2501 + 1.86*ts
+    return ts, np.where(np.abs(d) > 1e-6, (h - 1.006*ts)/d*1000, np.nan)
+
+# ASHRAE zone → (fill colour, line colour, linestyle)
+ZONE_STYLES_PNG = {
+    "A3/A4":       ("#27ae60", "#27ae60", "--"),
+    "A1/A2":       ("#2980b9", "#2980b9", "--"),
+    "Recommended": ("#e74c3c", "#e74c3c", "-"),
+}
 
 # ── Process line colors matching Excel ───────────────────────────────────────
 PROC_COLORS = {
@@ -114,78 +120,90 @@ PROC_COLORS = {
     ("CRAH On-Coil",  "CRAH Off-Coil"): "#000000",   # black
     ("Return Air",    "CRAH On-Coil"):  "#000000",
 }
+PROC_RGBA = {k: to_rgba(v) for k, v in PROC_COLORS.items()}  # parsed once
+PROC_RGBA_DEFAULT = to_rgba("#555555")
+
+
+DPI = 150           # figure and output resolution: 16×10 in → 2400×1500 px
+T0, T1 = -5,  50    # Dry bulb X axis
+W0, W1 =  0,  36    # Humidity Y axis (right side)
+
+
+# Major gridlines: every 5 °C and every 1 g/kg, i.e. on the axis ticks
+GRID_SEGMENTS = ([[(x, W0), (x, W1)] for x in range(T0, T1+1, 5)] +
+                 [[(T0, y), (T1, y)] for y in range(W0, W1+1, 1)])
+GRID_LINE_RGBA = to_rgba("#e8e8e8")
+
+
+def _clip(ts, ws):
+    m = (ts >= T0) & (ts <= T1) & (ws >= W0-0.2) & (ws <= W1+0.2) & \
+        np.isfinite(ts) & np.isfinite(ws)
+    return ts[m], ws[m]
+
+
+@lru_cache(maxsize=8)
+def _background(P):
+    """Clipped curves for the enthalpy, WB and RH grids, the saturation
+    line and the ASHRAE zone polygons. They depend only on pressure, so they are built once
+    per site and shared by every render (treat the arrays as read-only)."""
+    def family(curves):  # (n, 2) vertex arrays, as LineCollection takes them
+        return tuple(np.column_stack([tc, wc])
+                     for tc, wc in (_clip(ts, ws) for ts, ws in curves) if len(tc) >= 2)
+    enth = family(_enth_line(h, P, T0-5, T1+5) for h in range(-20, 160, 10))
+    wb   = family(_wb_line(twb, P, T0, T1) for twb in range(-5, 51, 5))
+    rh   = family(_rh_curve(rh, P, T0, T1)
+                  for rh in [0.10,0.20,0.30,0.40,0.50,0.60,0.70,0.80,0.90])
+    sat  = _clip(*_sat(P, T0, T1))
+    zones = []
+    for zlabel, *limits in ASHRAE_ZONES:
+        zx, zy = ashrae_zone_polygon(*limits, P)
+        if len(zx):
+            zones.append((zlabel, zx, zy))
+    return enth, wb, rh, sat, tuple(zones)
+
+
+# One figure is reused for every render: clearing its axes is much cheaper
+# than building a new figure. Matplotlib artists are not thread-safe and
+# renders can come from several Streamlit sessions, so access is serialised.
+_FIG, _AX = plt.subplots(figsize=(16, 10), dpi=DPI)
+_FIG_LOCK = threading.Lock()
+# Fixed margins, as measured from tight_layout(pad=1.2) for this layout: the
+# tick labels, axis labels and title height never change, so the layout
+# pass is not repeated on every render
+_FIG.subplots_adjust(left=0.01625, right=0.9458, bottom=0.0605, top=0.9578)
 
 
 def render_chart_png(inp: dict, states: dict, P: float) -> bytes:
+    with _FIG_LOCK:
+        _AX.cla()
+        return _render(_FIG, _AX, inp, states, P)
 
-    T0, T1 = -5,  50    # Dry bulb X axis
-    W0, W1 =  0,  36    # Humidity Y axis (right side)
 
-    fig, ax = plt.subplots(figsize=(16, 10), dpi=140)
+def _render(fig, ax, inp, states, P):
     fig.patch.set_facecolor("white")
     ax.set_facecolor("white")
     ax.set_xlim(T0, T1)
     ax.set_ylim(W0, W1)
 
-    def _clip(ts, ws):
-        m = (ts >= T0) & (ts <= T1) & (ws >= W0-0.2) & (ws <= W1+0.2) & \
-            np.isfinite(ts) & np.isfinite(ws)
-        return ts[m], ws[m]
+    enth_curves, wb_curves, rh_curves, (t_sat, w_sat), zones = _background(P)
 
     # ── Enthalpy / WB diagonal lines (beige, same style as Excel) ────────
-    for h in range(-20, 160, 10):
-        ts, ws = _enth_line(h, P, T0-5, T1+5)
-        tc, wc = _clip(ts, ws)
-        if len(tc) < 2: continue
-        ax.plot(tc, wc, color=C["enth"], lw=0.6, zorder=1)
-
-    for twb in range(-5, 51, 5):
-        ts, ws = _wb_line(twb, P, T0, T1)
-        tc, wc = _clip(ts, ws)
-        if len(tc) < 2: continue
-        ax.plot(tc, wc, color=C["wb"], lw=0.5, zorder=1)
+    # One LineCollection per family; caps/joins match the Line2D defaults
+    ax.add_collection(LineCollection(enth_curves, colors=[GRID_RGBA["enth"]],
+                      linewidths=0.6, capstyle="projecting", joinstyle="round", zorder=1))
+    ax.add_collection(LineCollection(wb_curves, colors=[GRID_RGBA["wb"]],
+                      linewidths=0.5, capstyle="projecting", joinstyle="round", zorder=1))
 
     # ── RH curves (beige) ─────────────────────────────────────────────────
-    for rh in [0.10,0.20,0.30,0.40,0.50,0.60,0.70,0.80,0.90]:
-        ts, ws = _rh_curve(rh, P, T0, T1)
-        tc, wc = _clip(ts, ws)
-        if len(tc) < 2: continue
-        ax.plot(tc, wc, color=C["rh"], lw=0.65, zorder=2)
+    ax.add_collection(LineCollection(rh_curves, colors=[GRID_RGBA["rh"]],
+                      linewidths=0.65, capstyle="projecting", joinstyle="round", zorder=2))
 
     # ── Saturation curve (red, like Excel) ───────────────────────────────
-    ts_sat, ws_sat = _sat(P, T0, T1)
-    tc, wc = _clip(ts_sat, ws_sat)
-    ax.plot(tc, wc, color=C["sat"], lw=1.8, zorder=5)
+    ax.plot(t_sat, w_sat, color=C["sat"], lw=1.8, zorder=5)
 
     # ── ASHRAE TC9.9 2021 multi-zone polygons ────────────────────────────
-    import numpy as _np, psychrolib as _psl
-    _psl.SetUnitSystem(_psl.SI)
-
-    def _ashrae_poly(tmin, tmax, rh_lo, rh_hi, dp_min_c, dp_max_c, n=300):
-        """Zone polygon clipped by RH curves and dew-point horizontal lines."""
-        t = _np.linspace(tmin, tmax, n)
-        lo_rh = _np.array([_psl.GetHumRatioFromRelHum(ti, rh_lo, P)*1000 for ti in t])
-        hi_rh = _np.array([_psl.GetHumRatioFromRelHum(ti, rh_hi, P)*1000 for ti in t])
-        dp_lo_w = _psl.GetHumRatioFromTDewPoint(dp_min_c, P) * 1000
-        dp_hi_w = _psl.GetHumRatioFromTDewPoint(dp_max_c, P) * 1000
-        lower = _np.maximum(lo_rh, dp_lo_w)
-        upper = _np.minimum(hi_rh, dp_hi_w)
-        valid = upper > lower
-        t, lower, upper = t[valid], lower[valid], upper[valid]
-        if len(t) < 2:
-            return [], []
-        return list(t) + list(t[::-1]), list(lower) + list(upper[::-1])
-
-    # (label, tmin, tmax, rh_lo, rh_hi, dp_min, dp_max, fill_colour, line_colour, linestyle)
-    ASHRAE_ZONES_PNG = [
-        ("A3/A4",       5,  40, 0.08, 0.85, -12, 24, "#27ae60", "#27ae60", "--"),
-        ("A1/A2",       15, 32, 0.08, 0.80, -12, 17, "#2980b9", "#2980b9", "--"),
-        ("Recommended", 18, 27, 0.08, 0.60,  -9, 15, "#e74c3c", "#e74c3c", "-"),
-    ]
-    for zlabel, ztmin, ztmax, zrh_lo, zrh_hi, zdp_min, zdp_max, zfill, zline, zls in ASHRAE_ZONES_PNG:
-        zx, zy = _ashrae_poly(ztmin, ztmax, zrh_lo, zrh_hi, zdp_min, zdp_max)
-        if not zx:
-            continue
+    for zlabel, zx, zy in zones:
+        zfill, zline, zls = ZONE_STYLES_PNG[zlabel]
         ax.fill(zx, zy, color=zfill, alpha=0.08, zorder=3)
         ax.plot(zx, zy, color=zline, lw=1.5, ls=zls, zorder=4,
                 label=f"ASHRAE {zlabel}")
@@ -200,27 +218,35 @@ def render_chart_png(inp: dict, states: dict, P: float) -> bytes:
         ("CRAH On-Coil",  "CRAH Off-Coil"),
         ("Return Air",    "CRAH On-Coil"),
     ]
+    segs, cols = [], []
     for a, b in proc_pairs:
         if a in states and b in states:
-            col = PROC_COLORS.get((a, b), "#555555")
             p1, p2 = states[a], states[b]
-            ax.plot([p1.tdb, p2.tdb], [p1.w_gkg, p2.w_gkg],
-                    color=col, lw=2.0, zorder=6, solid_capstyle="round")
+            segs.append([(p1.tdb, p1.w_gkg), (p2.tdb, p2.w_gkg)])
+            cols.append(PROC_RGBA.get((a, b), PROC_RGBA_DEFAULT))
+    ax.add_collection(LineCollection(segs, colors=cols, linewidths=2.0,
+                                     capstyle="round", zorder=6))
 
     # ── State points & labels ─────────────────────────────────────────────
+    # One scatter call per (marker, colour) style, sizes passed as an array
+    buckets = {}
     for name, st in states.items():
         _, col, mk, ms = POINT_STYLES.get(name, ("Other","#000","x",60))
+        b = buckets.setdefault((mk, col), ([], [], []))
+        b[0].append(st.tdb); b[1].append(st.w_gkg); b[2].append(ms)
+    for (mk, col), (xs, ys, ss) in buckets.items():
         lw = 2.0 if mk == "x" else 1.5
         fc = col if mk == "o" else "none"
-        ax.scatter(st.tdb, st.w_gkg, s=ms, c=fc,
+        ax.scatter(xs, ys, s=ss, c=fc,
                    edgecolors=col, linewidths=lw, marker=mk, zorder=9)
+
+    for name, st in states.items():
         lbl = LABEL_MAP.get(name, name)
         if lbl:
             # offset label below-right like the Excel chart
             ax.text(st.tdb + 0.4, st.w_gkg - 0.5, lbl,
-                    fontsize=6.8, color="#333333",
-                    ha="left", va="top", zorder=10,
-                    fontfamily="Arial")
+                    fontproperties=LABEL_FONT, color="#333333",
+                    ha="left", va="top", zorder=10)
 
     # ── Right Y axis for Humidity Ratio ──────────────────────────────────
     # Hide left Y axis ticks/label, put humidity on right
@@ -245,7 +271,10 @@ def render_chart_png(inp: dict, states: dict, P: float) -> bytes:
                               direction="out", length=3)
 
     # ── Grid ──────────────────────────────────────────────────────────────
-    ax.grid(True, color="#e8e8e8", lw=0.4, zorder=0)
+    # Gridlines sit on the fixed major ticks, so they are one prebuilt collection;
+    # snap=True keeps them pixel-aligned like the per-tick gridlines were
+    ax.add_collection(LineCollection(GRID_SEGMENTS, colors=[GRID_LINE_RGBA], linewidths=0.4,
+                                     capstyle="projecting", snap=True, zorder=0))
     ax.set_axisbelow(True)
     for s in ax.spines.values():
         s.set_color("#cccccc")
@@ -262,11 +291,11 @@ def render_chart_png(inp: dict, states: dict, P: float) -> bytes:
         f"P = {P/1000:.3f} kPa  ·  IT Load {load:.0f} kW",
         fontsize=11, color="#1a1a2e", pad=10)
 
-    plt.tight_layout(pad=1.2)
-
+    # Encode the Agg buffer directly (the figure is already at output DPI).
+    # Opaque RGB with fast deflate: the PNG is stored inside the zipped workbook.
+    fig.canvas.draw()
+    img = Image.frombuffer("RGBA", fig.canvas.get_width_height(),
+                           fig.canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150,
-                facecolor="white", edgecolor="none")
-    plt.close(fig)
-    buf.seek(0)
-    return buf.read()
+    img.convert("RGB").save(buf, format="PNG", compress_level=1)
+    return buf.getvalue()
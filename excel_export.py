@@ -6,11 +6,16 @@ then embeds the live Plotly chart as a high-res PNG image at the bottom.
 """
 
 import io
-import plotly.graph_objects as go
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.borders import DEFAULT_BORDER
 from openpyxl.drawing.image import Image as XLImage
-from openpyxl.utils import get_column_letter
+from openpyxl.utils import get_column_letter, column_index_from_string
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # ── Color palette ─────────────────────────────────────────────────────────────
 C_TITLE_BG   = "747474"
@@ -24,40 +29,65 @@ C_PROC_FG    = "FFFFFF"
 C_RED        = "FF0000"
 
 # ── Style helpers ─────────────────────────────────────────────────────────────
+# Cached so that equal arguments always hand back the same style instance.
+@lru_cache(maxsize=64)
 def _fill(hex_color):
     return PatternFill("solid", fgColor=hex_color)
 
+@lru_cache(maxsize=64)
 def _font(bold=False, color="000000", size=8, name="Arial"):
     return Font(bold=bold, color=color, size=size, name=name)
 
+@lru_cache(maxsize=64)
 def _align(h="left", v="center", wrap=False, rot=0):
     return Alignment(horizontal=h, vertical=v, wrap_text=wrap, text_rotation=rot)
 
+_THIN = Side(border_style="thin")
+
+@lru_cache(maxsize=64)
 def _border_thin(top=False, bottom=False, left=False, right=False):
-    s = Side(border_style="thin")
     return Border(
-        top=s if top else None,
-        bottom=s if bottom else None,
-        left=s if left else None,
-        right=s if right else None,
+        top=_THIN if top else None,
+        bottom=_THIN if bottom else None,
+        left=_THIN if left else None,
+        right=_THIN if right else None,
     )
 
-def _apply_row_fill(ws, row, col_start, col_end, bg):
+# Shared style instances — openpyxl de-duplicates styles by hashing and
+# comparing them on every assignment, so reusing one object per style skips
+# both the allocation and the equality check.
+FONT            = _font()
+FONT_BOLD       = _font(True)
+FONT_RED        = _font(color=C_RED)
+FONT_BOLD_RED   = _font(True, C_RED)
+FONT_BOLD_SUB   = _font(True, C_SUB_FG)
+FONT_BOLD_WHITE = _font(True, C_TITLE_FG)
+FILL_TITLE      = _fill(C_TITLE_BG)
+FILL_SUB        = _fill(C_SUB_BG)
+FILL_PROC       = _fill(C_PROC_BG)
+ALIGN_CENTER    = _align(h="center")
+ALIGN_CENTER_WRAP = _align(h="center", wrap=True)
+ALIGN_HDR_ROT   = _align(h="center", v="bottom", wrap=True, rot=90)
+BORDER_TOP      = _border_thin(top=True)
+BORDER_TOP_LEFT = _border_thin(top=True, left=True)
+
+def _apply_row_fill(ws, row, col_start, col_end, fill):
     for c in range(col_start, col_end + 1):
-        ws.cell(row=row, column=c).fill = _fill(bg)
+        ws.cell(row=row, column=c).fill = fill
 
 def _section_hdr(ws, row, num, label, bg=C_SECT_BG, fg=C_SECT_FG, ncols=17):
-    _apply_row_fill(ws, row, 1, ncols, bg)
+    fill, font = _fill(bg), _font(True, fg)
+    _apply_row_fill(ws, row, 1, ncols, fill)
     c = ws.cell(row=row, column=1)
-    c.value, c.font, c.fill = num, _font(True, fg), _fill(bg)
-    c.alignment = _align(h="center")
+    c.value, c.font = num, font
+    c.alignment = ALIGN_CENTER
     c = ws.cell(row=row, column=2)
-    c.value, c.font, c.fill = label, _font(True, fg), _fill(bg)
+    c.value, c.font = label, font
 
 def _sub_hdr(ws, row, label, ncols=17):
-    _apply_row_fill(ws, row, 1, ncols, C_SUB_BG)
+    _apply_row_fill(ws, row, 1, ncols, FILL_SUB)
     c = ws.cell(row=row, column=2)
-    c.value, c.font = label, _font(True, C_SUB_FG)
+    c.value, c.font = label, FONT_BOLD_SUB
 
 # ── Psychrometric formula templates ──────────────────────────────────────────
 WEXLER = ('EXP(-5800.2206/(C{r}+273.15)+1.3914993'
@@ -78,15 +108,24 @@ MOIST_FMTS = {
     'K': '0.000"kPa"', 'L': '0.000"kg/m3"', 'M': '0.000"kJ/kg.K"', 'N': '0.0',
 }
 
+def _add_moist_styles(wb):
+    """Register a named style (Arial 8, centred, number format) for each
+    formula column of the moist-air table; one lookup per cell afterwards."""
+    for col_ltr, fmt in MOIST_FMTS.items():
+        if col_ltr not in 'CD':
+            wb.add_named_style(NamedStyle(name=f'moist_{col_ltr}', font=FONT,
+                                          border=DEFAULT_BORDER, alignment=ALIGN_CENTER,
+                                          number_format=fmt))
+
 def _moist_row(ws, r, name, tdb, twb, ashrae=True, red_inputs=True):
     ws.cell(row=r, column=2).value = name
-    ws.cell(row=r, column=2).font = _font()
+    ws.cell(row=r, column=2).font = FONT
 
     for col, val, red in [(3, tdb, red_inputs), (4, twb, red_inputs)]:
         c = ws.cell(row=r, column=col)
         c.value = val
-        c.font = _font(color=C_RED if red else "000000")
-        c.alignment = _align(h="center")
+        c.font = FONT_RED if red else FONT
+        c.alignment = ALIGN_CENTER
 
     pvsat_dbt = WEXLER.format(r=r) if ashrae else MAGNUS.format(r=r)
     pv_f = (f'IF(B{r}="","",J{r}-($D$17*0.000665*(C{r}-D{r})))' if ashrae
@@ -105,33 +144,35 @@ def _moist_row(ws, r, name, tdb, twb, ashrae=True, red_inputs=True):
         'M': f'=IF(B{r}="","",((1005+0.1*C{r}+0.000025*C{r}^2)*($D$17/101.325)^-0.07)/1000)',
         'N': f'=IFERROR(IF(B{r}="","",(0.62198*K{r})/($D$17-K{r})*1000),"")',
     }
-    for col_ltr, formula in formulas.items():
-        c = ws[f'{col_ltr}{r}']
-        c.value = formula
-        c.font = _font()
-        c.alignment = _align(h="center")
-
     for col_ltr, fmt in MOIST_FMTS.items():
-        ws[f'{col_ltr}{r}'].number_format = fmt
+        c = ws.cell(row=r, column=column_index_from_string(col_ltr))
+        if col_ltr in formulas:
+            c.value = formulas[col_ltr]
+            c.style = f'moist_{col_ltr}'
+        else:
+            c.number_format = fmt
+
+
+def _idx(r, k):
+    """INDEX/MATCH of column k in the moist-air table for the state named in D{r}."""
+    return f'INDEX($C$27:$N$51,MATCH($D{r},$B$27:$B$51,0),{k})'
 
 
 def _proc_pair(ws, r_in, r_out, name, in_state, out_state, flow_ref='$D$15', note=''):
     ws.merge_cells(f'B{r_in}:B{r_out}')
     c = ws.cell(row=r_in, column=2)
-    c.value, c.font = name, _font(color=C_RED)
-    c.alignment = _align(h="center", wrap=True)
+    c.value, c.font = name, FONT_RED
+    c.alignment = ALIGN_CENTER_WRAP
 
     for r, state, io in [(r_in, in_state, 'In'), (r_out, out_state, 'Out')]:
-        ws.cell(row=r, column=3).value = io
-        ws.cell(row=r, column=3).font = _font()
-        ws.cell(row=r, column=3).alignment = _align(h="center")
-        ws.cell(row=r, column=4).value = state
-        ws.cell(row=r, column=4).font = _font(color=C_RED)
-        ws.cell(row=r, column=4).alignment = _align(h="center")
+        c = ws.cell(row=r, column=3)
+        c.value, c.font, c.alignment = io, FONT, ALIGN_CENTER
+        c = ws.cell(row=r, column=4)
+        c.value, c.font, c.alignment = state, FONT_RED, ALIGN_CENTER
 
-        tdb_f = f'=IFERROR(INDEX($C$27:$N$51,MATCH($D{r},$B$27:$B$51,0),1),"")'
-        w_f   = f'=IFERROR(INDEX($C$27:$N$51,MATCH($D{r},$B$27:$B$51,0),4),"")'
-        mdot_f= f'={flow_ref}*(INDEX($C$27:$N$51,MATCH($D{r},$B$27:$B$51,0),10))'
+        tdb_f = f'=IFERROR({_idx(r, 1)},"")'
+        w_f   = f'=IFERROR({_idx(r, 4)},"")'
+        mdot_f= f'={flow_ref}*({_idx(r, 10)})'
 
         for col, val, fmt in [
             (5, tdb_f,  '0.0"°C"'),
@@ -140,48 +181,32 @@ def _proc_pair(ws, r_in, r_out, name, in_state, out_state, flow_ref='$D$15', not
         ]:
             c = ws.cell(row=r, column=col)
             c.value, c.number_format = val, fmt
-            c.alignment = _align(h="center")
-
-    # Heat calcs on in-row — col 4=W(g/kg), 5=h in $C$27:$N$51
-    ws[f'H{r_in}'].value = (
-        f'=G{r_out}*(INDEX($C$27:$N$51,MATCH(D{r_in},$B$27:$B$51,0),4)'
-        f'-INDEX($C$27:$N$51,MATCH(D{r_out},$B$27:$B$51,0),4))'
-    )
-    ws[f'H{r_in}'].number_format = '0.0"g/s"'
-    ws[f'H{r_in}'].alignment = _align(h="center")
-
-    ws[f'I{r_in}'].value = (
-        f'=G{r_out}*INDEX($C$27:$N$51,MATCH($D{r_in},$B$27:$B$51,0),11)'
-        f'*(INDEX($C$27:$N$51,MATCH($D{r_out},$B$27:$B$51,0),1)'
-        f'-INDEX($C$27:$N$51,MATCH($D{r_in},$B$27:$B$51,0),1))'
-    )
-    ws[f'I{r_in}'].number_format = '0.00"kW"'
-    ws[f'I{r_in}'].alignment = _align(h="center")
-
-    ws[f'J{r_in}'].value = f'=K{r_in}-I{r_in}'
-    ws[f'J{r_in}'].number_format = '0.00"kW"'
-    ws[f'J{r_in}'].alignment = _align(h="center")
-
-    ws[f'K{r_in}'].value = (
-        f'=-G{r_out}*(INDEX($C$27:$N$51,MATCH(D{r_in},$B$27:$B$51,0),5)'
-        f'-INDEX($C$27:$N$51,MATCH(D{r_out},$B$27:$B$51,0),5))'
-    )
-    ws[f'K{r_in}'].font = _font(bold=True)
-    ws[f'K{r_in}'].number_format = '0.00"kW"'
-    ws[f'K{r_in}'].alignment = _align(h="center")
-
-    ws[f'L{r_in}'].value = f'=IFERROR(I{r_in}/K{r_in},"")'
-    ws[f'L{r_in}'].number_format = '0.000'
-    ws[f'L{r_in}'].alignment = _align(h="center")
+            c.alignment = ALIGN_CENTER
+
+    # Heat calcs on in-row — col 1=Tdb, 4=W(g/kg), 5=h, 11=Cp in $C$27:$N$51
+    tdb_in, tdb_out = _idx(r_in, 1), _idx(r_out, 1)
+    w_in, w_out     = _idx(r_in, 4), _idx(r_out, 4)
+    h_in, h_out     = _idx(r_in, 5), _idx(r_out, 5)
+    for col, val, fmt in [
+        (8,  f'=G{r_out}*({w_in}-{w_out})', '0.0"g/s"'),
+        (9,  f'=G{r_out}*{_idx(r_in, 11)}*({tdb_out}-{tdb_in})', '0.00"kW"'),
+        (10, f'=K{r_in}-I{r_in}', '0.00"kW"'),
+        (11, f'=-G{r_out}*({h_in}-{h_out})', '0.00"kW"'),
+        (12, f'=IFERROR(I{r_in}/K{r_in},"")', '0.000'),
+    ]:
+        c = ws.cell(row=r_in, column=col)
+        c.value, c.number_format = val, fmt
+        c.alignment = ALIGN_CENTER
+    ws.cell(row=r_in, column=11).font = FONT_BOLD
 
     if note:
         ws.cell(row=r_in, column=13).value = note
-        ws.cell(row=r_in, column=13).font = _font(size=8)
+        ws.cell(row=r_in, column=13).font = FONT
 
 
 # ── Main builder ──────────────────────────────────────────────────────────────
 
-def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None) -> bytes:
+def build_excel(inp: dict, fig: "go.Figure", states: dict = None, P: float = None) -> bytes:
     """
     Build the full AHU Design Excel workbook and return as bytes.
 
@@ -195,6 +220,7 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     wb = Workbook()
     ws = wb.active
     ws.title = "AHU DESIGN"
+    _add_moist_styles(wb)
 
     # ── Column widths ──────────────────────────────────────────────────────
     col_widths = {
@@ -214,25 +240,25 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
 
     # ── Rows 1-2: Notes ───────────────────────────────────────────────────
     ws['B1'].value = 'NOTE: ONLY MODIFY RED VALUES, THE OTHERS ARE CALCULATED'
-    ws['B1'].font = _font(True, C_RED)
+    ws['B1'].font = FONT_BOLD_RED
     ws['B2'].value = 'ADJUST VIEW — select chart, choose format axis, update min/max as required'
-    ws['B2'].font = _font(True, C_RED)
+    ws['B2'].font = FONT_BOLD_RED
 
     # ── Row 5: Title bar ──────────────────────────────────────────────────
     ws.merge_cells('A5:P5')
     ws['A5'].value = 'CALCULATION SHEET'
-    ws['A5'].font = _font(True, C_TITLE_FG)
-    ws['A5'].fill = _fill(C_TITLE_BG)
-    ws['A5'].alignment = _align(h="center")
+    ws['A5'].font = FONT_BOLD_WHITE
+    ws['A5'].fill = FILL_TITLE
+    ws['A5'].alignment = ALIGN_CENTER
     for c in range(1, 17):
-        ws.cell(row=5, column=c).fill = _fill(C_TITLE_BG)
+        ws.cell(row=5, column=c).fill = FILL_TITLE
 
     # ── Section 1: Global Inputs ──────────────────────────────────────────
     _section_hdr(ws, 10, 1, 'GLOBAL INPUTS')
 
     for r, label in [(6,'Project'),(7,'Project number'),(8,'Revision'),(9,'Author')]:
         ws.cell(row=r, column=2).value = label
-        ws.cell(row=r, column=2).font = _font(True)
+        ws.cell(row=r, column=2).font = FONT_BOLD
 
     project_vals = {
         6: inp.get('project', 'PROJECT NAME'),
@@ -242,10 +268,10 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     }
     for r, val in project_vals.items():
         ws.cell(row=r, column=4).value = val
-        ws.cell(row=r, column=4).font = _font()
+        ws.cell(row=r, column=4).font = FONT
 
     ws['F9'].value = '*input parameters are indicated in red'
-    ws['F9'].font = _font(color=C_RED)
+    ws['F9'].font = FONT_RED
 
     global_rows = [
         (11, 'FACILITY LOCATION',            inp.get('city',''),              True,  'General'),
@@ -260,11 +286,11 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     ]
     for r, label, val, red, fmt in global_rows:
         ws.cell(row=r, column=2).value = label
-        ws.cell(row=r, column=2).font = _font()
+        ws.cell(row=r, column=2).font = FONT
         c = ws.cell(row=r, column=4)
         c.value = val
-        c.font = _font(color=C_RED if red else "000000")
-        c.alignment = _align(h="center")
+        c.font = FONT_RED if red else FONT
+        c.alignment = ALIGN_CENTER
         c.number_format = fmt
 
     ws['E18'].value = 'est'
@@ -286,25 +312,20 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     for col, hdr in hdrs_21:
         cell = ws.cell(row=21, column=col)
         cell.value = hdr
-        cell.font = _font(True)
-        cell.alignment = Alignment(horizontal="center", vertical="bottom",
-                                   wrap_text=True, text_rotation=90)
-        cell.border = Border(
-            top=Side(border_style="thin"),
-            left=Side(border_style="thin") if col > 2 else None,
-        )
+        cell.font = FONT_BOLD
+        cell.alignment = ALIGN_HDR_ROT
+        cell.border = BORDER_TOP_LEFT if col > 2 else BORDER_TOP
 
     ws.cell(row=21, column=15).value = 'Notes / ASHRAE Limits'
-    ws.cell(row=21, column=15).font = _font(True)
-    ws.cell(row=21, column=15).alignment = Alignment(
-        horizontal="center", vertical="bottom", wrap_text=True, text_rotation=90)
+    ws.cell(row=21, column=15).font = FONT_BOLD
+    ws.cell(row=21, column=15).alignment = ALIGN_HDR_ROT
 
     # ── 2.1 ASHRAE A1 zone ─────────────────────────────────────────────
     _sub_hdr(ws, 22, 'ASHRAE COLD AISLE ZONE FOR DATA CENTRES')
     ws.cell(row=22, column=16).value = 'Ashrae dp'
-    ws.cell(row=22, column=16).font = _font(True, C_SUB_FG)
+    ws.cell(row=22, column=16).font = FONT_BOLD_SUB
     ws.cell(row=22, column=17).value = 'Ashrae RH'
-    ws.cell(row=22, column=17).font = _font(True, C_SUB_FG)
+    ws.cell(row=22, column=17).font = FONT_BOLD_SUB
 
     ashrae_data = [
         (23, 'Ash 18 constant temp', inp.get('ash_18_low_tdb', 18),  inp.get('ash_twb_low', 6.4),    '>-9',  '-'),
@@ -314,16 +335,16 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     ]
     for r, name, tdb, twb, dp, rh_note in ashrae_data:
         _moist_row(ws, r, name, tdb, twb, ashrae=True)
-        ws[f'O{r}'].value = dp
-        ws[f'P{r}'].value = rh_note
+        ws.cell(row=r, column=15).value = dp
+        ws.cell(row=r, column=16).value = rh_note
 
     # ── 2.2 Control conditions ─────────────────────────────────────────
     _section_hdr(ws, 27, 2, 'CONTROL CONDITIONS')
     _moist_row(ws, 28, 'CRAH OFF COIL', inp.get('crah_off_tdb',25), inp.get('crah_off_twb',16.5))
-    ws['B28'].alignment = _align(h="center")
+    ws['B28'].alignment = ALIGN_CENTER
     ws['O28'].value = 'CRAH unit off coil — ensures no load on CRAH at start'
     _moist_row(ws, 29, 'CRAH ON COIL',  inp.get('crah_on_tdb',36),  inp.get('crah_on_twb',19.8))
-    ws['B29'].alignment = _align(h="center")
+    ws['B29'].alignment = ALIGN_CENTER
 
     # ── 2.3 Outdoor inlet ──────────────────────────────────────────────
     _section_hdr(ws, 30, 3, 'OUTDOOR INLET CONDITIONS')
@@ -336,9 +357,9 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     ]
     for r, name, tdb, twb, note in outdoor:
         _moist_row(ws, r, name, tdb, twb, ashrae=False)
-        ws[f'B{r}'].alignment = _align(h="center")
+        ws.cell(row=r, column=2).alignment = ALIGN_CENTER
         if note:
-            ws[f'O{r}'].value = note
+            ws.cell(row=r, column=15).value = note
 
     # ── 2.4 AHU off-coil ───────────────────────────────────────────────
     _sub_hdr(ws, 36, 'AHU OFF COIL CONDITIONS')
@@ -351,23 +372,23 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     ]
     for r, name, tdb, twb, note in oc_data:
         _moist_row(ws, r, name, tdb, twb, ashrae=False)
-        ws[f'B{r}'].alignment = _align(h="center")
-        ws[f'D{r}'].value = twb
-        ws[f'D{r}'].font = _font()
+        ws.cell(row=r, column=2).alignment = ALIGN_CENTER
+        c = ws.cell(row=r, column=4)
+        c.value, c.font = twb, FONT
         if note:
-            ws[f'O{r}'].value = note
+            ws.cell(row=r, column=15).value = note
 
     # ── 2.5 Return air ─────────────────────────────────────────────────
     _section_hdr(ws, 42, 4, 'RETURN AIR CONDITIONS')
     _moist_row(ws, 43, 'RA CONDITION', inp.get('ra_tdb',35), inp.get('ra_twb',25), ashrae=False)
-    ws['B43'].alignment = _align(h="center")
+    ws['B43'].alignment = ALIGN_CENTER
 
     # ── 2.6 Energy recovery ────────────────────────────────────────────
     _sub_hdr(ws, 44, 'ENERGY RECOVERY')
     _moist_row(ws, 45, 'E-WHEEL',       '=C43', '=D43', ashrae=False)
-    ws['B45'].alignment = _align(h="center")
+    ws['B45'].alignment = ALIGN_CENTER
     _moist_row(ws, 46, 'RUN AROUND COIL', 0, 0, ashrae=False)
-    ws['B46'].alignment = _align(h="center")
+    ws['B46'].alignment = ALIGN_CENTER
 
     for r in [48, 49, 50, 51]:
         _moist_row(ws, r, '', 0, 0, ashrae=False)
@@ -387,12 +408,11 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     for col, hdr in proc_hdrs:
         cell = ws.cell(row=53, column=col)
         cell.value = hdr
-        cell.font = Font(bold=True, color=C_PROC_FG, size=8, name='Arial')
-        cell.fill = _fill(C_PROC_BG)
-        cell.alignment = Alignment(horizontal="center", vertical="bottom",
-                                   wrap_text=True, text_rotation=90)
+        cell.font = FONT_BOLD_WHITE
+        cell.fill = FILL_PROC
+        cell.alignment = ALIGN_HDR_ROT
     for col in range(1, 13):
-        ws.cell(row=53, column=col).fill = _fill(C_PROC_BG)
+        ws.cell(row=53, column=col).fill = FILL_PROC
 
     _proc_pair(ws, 54, 55, 'SENSIBLE COOLING TO CRAH OFF COIL',
                'MAX OAT (N=20)', 'MAX OAT (N=20)')
@@ -437,41 +457,17 @@ def build_excel(inp: dict, fig: go.Figure, states: dict = None, P: float = None)
     for r in range(chart_start_row + 1, chart_start_row + 35):
         ws.row_dimensions[r].height = 20
 
-    # ── Save to temp file, recalculate formulas, read back ────────────────
-    import tempfile, os, subprocess, json, sys
-
-    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
-        tmp_path = tmp.name
-
-    try:
-        wb.save(tmp_path)
-
-        # Run LibreOffice recalc to populate all formula values
-        scripts_dir = os.path.join(os.path.dirname(__file__), "scripts")
-        recalc_script = os.path.join(scripts_dir, "recalc.py")
-        result = subprocess.run(
-            [sys.executable, recalc_script, tmp_path, "60"],
-            capture_output=True, text=True, timeout=90
-        )
-        # Log any errors but don't fail — file is still usable with formulas
-        try:
-            info = json.loads(result.stdout)
-            if info.get("total_errors", 0) > 0:
-                print(f"[excel_export] recalc errors: {info['error_summary']}")
-        except Exception:
-            pass
-
-        with open(tmp_path, "rb") as f:
-            return f.read()
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except Exception:
-            pass
+    # ── Save ───────────────────────────────────────────────────────────────
+    # openpyxl stores formulas without cached results; its default calcPr
+    # (fullCalcOnLoad) has Excel/LibreOffice evaluate them all on open.
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
 
 
+@lru_cache(maxsize=1)
 def _blank_chart_png() -> bytes:
-    """Fallback: a plain white 1200x600 PNG."""
+    """Fallback: a plain white 1200x600 PNG (rendered once, then reused)."""
     import matplotlib
     matplotlib.use('Agg')
     import matplotlib.pyplot as plt
@@ -479,96 +475,8 @@ def _blank_chart_png() -> bytes:
     ax.text(0.5, 0.5, "Psychrometric Chart\n(states not available)",
             ha='center', va='center', transform=ax.transAxes, fontsize=14, color='#888')
     buf = io.BytesIO()
-    fig.savefig(buf, format='png', dpi=100, bbox_inches='tight', facecolor='white')
+    fig.savefig(buf, format='png', dpi=100, bbox_inches='tight', facecolor='white',
+                pil_kwargs={'compress_level': 1})
     plt.close(fig)
     buf.seek(0)
     return buf.read()
-    """Convert the dark-theme chart to a clean white-background version for Excel."""
-    import copy, plotly.graph_objects as go
-
-    wfig = go.Figure(fig)  # shallow copy — we'll update layout
-
-    # Color mappings: dark → light equivalents
-    dark_to_light = {
-        "#0f1117": "#ffffff",
-        "#1e2230": "#f0f0f0",
-        "rgba(150,150,150,0.35)": "rgba(180,180,180,0.5)",
-        "rgba(100,180,255,0.20)": "rgba(30,100,200,0.15)",
-        "rgba(200,200,100,0.20)": "rgba(150,150,0,0.15)",
-        "rgba(46,204,113,0.10)":  "rgba(46,204,113,0.12)",
-        "#ffffff": "#1a1a2e",     # saturation curve: white → dark navy
-        "#cccccc": "#333333",
-        "#2a2d3e": "#cccccc",
-        "rgba(15,17,23,0.85)":    "rgba(255,255,255,0.9)",
-        "#00c3ff": "#0066aa",
-        "#666": "#555555",
-        "#336699": "#1a5276",
-    }
-
-    def remap(color):
-        if color is None:
-            return color
-        return dark_to_light.get(str(color), color)
-
-    # Update traces
-    new_traces = []
-    for trace in wfig.data:
-        td = trace.to_plotly_json()
-
-        # Line color
-        if 'line' in td and td['line']:
-            td['line']['color'] = remap(td['line'].get('color'))
-
-        # Marker
-        if 'marker' in td and td['marker']:
-            td['marker']['color'] = remap(td['marker'].get('color'))
-            if 'line' in td['marker']:
-                mc = td['marker']['line'].get('color')
-                td['marker']['line']['color'] = '#333333' if mc == '#fff' else remap(mc)
-
-        # Fill color
-        if 'fillcolor' in td:
-            td['fillcolor'] = remap(td.get('fillcolor'))
-
-        # Text font color
-        if 'textfont' in td and td['textfont']:
-            td['textfont']['color'] = remap(td['textfont'].get('color'))
-
-        # Rebuild trace of same type
-        trace_type = type(trace)
-        new_traces.append(trace_type(**{k: v for k, v in td.items() if k != 'type'}))
-
-    wfig.data = []
-    for t in new_traces:
-        wfig.add_trace(t)
-
-    # Layout overrides
-    wfig.update_layout(
-        template="plotly_white",
-        paper_bgcolor="#ffffff",
-        plot_bgcolor="#ffffff",
-        font=dict(family="Arial", size=11, color="#1a1a2e"),
-        title=dict(
-            font=dict(color="#0066aa", size=13),
-        ),
-        xaxis=dict(
-            gridcolor="#e8e8e8",
-            linecolor="#cccccc",
-            tickcolor="#666666",
-            title_font=dict(color="#333333"),
-        ),
-        yaxis=dict(
-            gridcolor="#e8e8e8",
-            linecolor="#cccccc",
-            tickcolor="#666666",
-            title_font=dict(color="#333333"),
-        ),
-        legend=dict(
-            bgcolor="rgba(255,255,255,0.95)",
-            bordercolor="#cccccc",
-            borderwidth=1,
-            font=dict(color="#333333", size=10),
-        ),
-    )
-
-    return wfig
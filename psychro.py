@@ -6,6 +6,7 @@ All calculations at standard or site-specific pressure.
 import psychrolib
 import numpy as np
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 
 # Set SI units globally
@@ -28,27 +29,234 @@ class AirState:
     density: float = field(init=False) # [kg/m³]
 
     def __post_init__(self):
+        # Same validity test as state_properties: psychrolib rejects Twb above
+        # Tdb and temperatures outside its -100..200 °C range.
+        if not (-100 <= self.twb <= self.tdb <= 200):
+            self._set_fallback()
+            return
         p = self.pressure
-        try:
-            self.w = psychrolib.GetHumRatioFromTWetBulb(self.tdb, self.twb, p)
-            self.rh = psychrolib.GetRelHumFromHumRatio(self.tdb, self.w, p)
-            self.h = psychrolib.GetMoistAirEnthalpy(self.tdb, self.w) / 1000  # J/kg → kJ/kg
-            self.tdp = psychrolib.GetTDewPointFromHumRatio(self.tdb, self.w, p)
-            v = psychrolib.GetMoistAirVolume(self.tdb, self.w, p)
-            self.density = 1.0 / v
-        except Exception as e:
-            self.w = 0.0
-            self.rh = 0.0
-            self.h = self.tdb * 1.006
-            self.tdp = self.tdb - 2
-            self.density = 1.2
+        self.w = psychrolib.GetHumRatioFromTWetBulb(self.tdb, self.twb, p)
+        self.rh = psychrolib.GetRelHumFromHumRatio(self.tdb, self.w, p)
+        self.h = psychrolib.GetMoistAirEnthalpy(self.tdb, self.w) / 1000  # J/kg → kJ/kg
+        self.tdp = psychrolib.GetTDewPointFromHumRatio(self.tdb, self.w, p)
+        v = psychrolib.GetMoistAirVolume(self.tdb, self.w, p)
+        self.density = 1.0 / v
+
+    def _set_fallback(self):
+        """Placeholder values for a state psychrolib cannot solve."""
+        self.w = 0.0
+        self.rh = 0.0
+        self.h = self.tdb * 1.006
+        self.tdp = self.tdb - 2
+        self.density = 1.2
 
     @property
     def w_gkg(self):
         """Humidity ratio in g/kg (for chart display)."""
         return self.w * 1000
 
+    @classmethod
+    def from_arrays(cls, names, tdb, twb, pressure: float) -> list:
+        """Build several states from Tdb/Twb arrays in one vectorised pass."""
+        tdb = np.asarray(tdb, dtype=float)
+        twb = np.asarray(twb, dtype=float)
+        w, rh, h, tdp, density = state_properties(tdb, twb, pressure)
+        states = []
+        for i, name in enumerate(names):
+            s = cls.__new__(cls)
+            s.name, s.tdb, s.twb, s.pressure = name, float(tdb[i]), float(twb[i]), pressure
+            s.w, s.rh, s.h = float(w[i]), float(rh[i]), float(h[i])
+            s.tdp, s.density = float(tdp[i]), float(density[i])
+            states.append(s)
+        return states
+
+
+# ASHRAE TC9.9 2021 data centre envelopes
+# (name, tdb_min, tdb_max, rh_lower, rh_upper, dp_min_°C, dp_max_°C)
+ASHRAE_ZONES = [
+    ("A3/A4",        5,  40, 0.08, 0.85, -12, 24),
+    ("A1/A2",        15, 32, 0.08, 0.80, -12, 17),
+    ("Recommended",  18, 27, 0.08, 0.60, -9,  15),
+]
+
+
+def ashrae_zone_polygon(tmin, tmax, rh_lo, rh_hi, dp_min_c, dp_max_c, pressure, n=300):
+    """Compute ASHRAE zone polygon clipped by both RH curves and dew-point lines.
+    Returns (x, y) arrays in °C and g/kg, empty if the zone has no extent."""
+    t = np.linspace(tmin, tmax, n)
+    lower_rh = hum_ratio_from_rh(t, rh_lo, pressure) * 1000
+    upper_rh = hum_ratio_from_rh(t, rh_hi, pressure) * 1000
+    dp_lo_w, dp_hi_w = sat_hum_ratio(np.array([dp_min_c, dp_max_c], dtype=float), pressure) * 1000
+    lower = np.maximum(lower_rh, dp_lo_w)
+    upper = np.minimum(upper_rh, dp_hi_w)
+    valid = upper > lower
+    t, lower, upper = t[valid], lower[valid], upper[valid]
+    if len(t) < 2:
+        return np.array([]), np.array([])
+    return np.concatenate([t, t[::-1]]), np.concatenate([lower, upper[::-1]])
+
+
+# ── Vectorised ASHRAE formulas (SI) ───────────────────────────────────────────
+# NumPy ports of the psychrolib functions used by the app, so that arrays of
+# states can be evaluated in one pass. ASHRAE Handbook — Fundamentals (2017) ch. 1.
+
+MIN_HUM_RATIO = psychrolib.MIN_HUM_RATIO
+TRIPLE_POINT  = psychrolib.TRIPLE_POINT_WATER_SI
+
+
+def sat_vapour_pressure(tdb):
+    """Saturation vapour pressure [Pa] over ice/water (eqn 5 & 6)."""
+    t = np.asarray(tdb, dtype=float)
+    T = t + 273.15
+    ln_ice = (-5.6745359E+03 / T + 6.3925247 - 9.677843E-03 * T + 6.2215701E-07 * T**2
+              + 2.0747825E-09 * T**3 - 9.484024E-13 * T**4 + 4.1635019 * np.log(T))
+    ln_wat = (-5.8002206E+03 / T + 1.3914993 - 4.8640239E-02 * T + 4.1764768E-05 * T**2
+              - 1.4452093E-08 * T**3 + 6.5459673 * np.log(T))
+    return np.exp(np.where(t <= TRIPLE_POINT, ln_ice, ln_wat))
+
+
+def _d_ln_pws(tdb):
+    """Derivative of ln(Pws) with respect to Tdb (used by the dew point solver)."""
+    t = np.asarray(tdb, dtype=float)
+    T = t + 273.15
+    d_ice = (5.6745359E+03 / T**2 - 9.677843E-03 + 2 * 6.2215701E-07 * T
+             + 3 * 2.0747825E-09 * T**2 - 4 * 9.484024E-13 * T**3 + 4.1635019 / T)
+    d_wat = (5.8002206E+03 / T**2 - 4.8640239E-02 + 2 * 4.1764768E-05 * T
+             - 3 * 1.4452093E-08 * T**2 + 6.5459673 / T)
+    return np.where(t <= TRIPLE_POINT, d_ice, d_wat)
+
+
+def _hum_ratio_from_vap_pres(pw, pressure):
+    return np.maximum(0.621945 * pw / (pressure - pw), MIN_HUM_RATIO)
+
+
+def _vap_pres_from_hum_ratio(w, pressure):
+    w = np.maximum(w, MIN_HUM_RATIO)
+    return pressure * w / (0.621945 + w)
+
+
+def sat_hum_ratio(tdb, pressure):
+    """Humidity ratio of saturated air [kg/kg]."""
+    return _hum_ratio_from_vap_pres(sat_vapour_pressure(tdb), pressure)
+
+
+def hum_ratio_from_rh(tdb, rh, pressure):
+    """Humidity ratio [kg/kg] from dry bulb and relative humidity (0-1)."""
+    return _hum_ratio_from_vap_pres(rh * sat_vapour_pressure(tdb), pressure)
+
+
+def hum_ratio_from_twb(tdb, twb, pressure):
+    """Humidity ratio [kg/kg] from dry and wet bulb (eqn 33 & 35)."""
+    tdb = np.asarray(tdb, dtype=float)
+    twb = np.asarray(twb, dtype=float)
+    ws = sat_hum_ratio(twb, pressure)
+    water = (((2501. - 2.326 * twb) * ws - 1.006 * (tdb - twb))
+             / (2501. + 1.86 * tdb - 4.186 * twb))
+    ice   = (((2830. - 0.24 * twb) * ws - 1.006 * (tdb - twb))
+             / (2830. + 1.86 * tdb - 2.1 * twb))
+    return np.maximum(np.where(twb >= 0, water, ice), MIN_HUM_RATIO)
+
+
+def rh_from_hum_ratio(tdb, w, pressure):
+    """Relative humidity (0-1) from dry bulb and humidity ratio."""
+    return _vap_pres_from_hum_ratio(w, pressure) / sat_vapour_pressure(tdb)
+
+
+def tdp_from_hum_ratio(tdb, w, pressure):
+    """Dew point [°C] by Newton-Raphson on ln(Pws), as psychrolib does."""
+    tdb = np.asarray(tdb, dtype=float)
+    ln_vp = np.log(_vap_pres_from_hum_ratio(w, pressure))
+    tdp = np.array(tdb, dtype=float, copy=True)
+    active = np.ones(tdp.shape, dtype=bool)
+    for _ in range(psychrolib.MAX_ITER_COUNT):
+        t_it = tdp[active]
+        t_new = t_it - (np.log(sat_vapour_pressure(t_it)) - ln_vp[active]) / _d_ln_pws(t_it)
+        t_new = np.clip(t_new, -100, 200)
+        done = np.abs(t_new - t_it) <= 0.001
+        tdp[active] = t_new
+        active[active] = ~done
+        if not active.any():
+            break
+    return np.minimum(tdp, tdb)
+
+
+def twb_from_hum_ratio(tdb, w, pressure):
+    """Wet bulb [°C] by bisection between dew point and dry bulb, as psychrolib does."""
+    tdb, w = np.broadcast_arrays(np.asarray(tdb, dtype=float), np.maximum(w, MIN_HUM_RATIO))
+    shape = tdb.shape
+    tdb, w = tdb.ravel(), w.ravel()
+    lo = tdp_from_hum_ratio(tdb, w, pressure)
+    hi = tdb.copy()
+    twb = (lo + hi) / 2
+    active = (hi - lo) > psychrolib.PSYCHROLIB_TOLERANCE
+    for _ in range(psychrolib.MAX_ITER_COUNT):
+        if not active.any():
+            break
+        t_it = twb[active]
+        above = hum_ratio_from_twb(tdb[active], t_it, pressure) > w[active]
+        lo[active] = np.where(above, lo[active], t_it)
+        hi[active] = np.where(above, t_it, hi[active])
+        twb[active] = (lo[active] + hi[active]) / 2
+        active[active] = (hi[active] - lo[active]) > psychrolib.PSYCHROLIB_TOLERANCE
+    return twb.reshape(shape)
+
+
+def moist_air_enthalpy(tdb, w):
+    """Moist air enthalpy [kJ/kg] (eqn 30)."""
+    w = np.maximum(w, MIN_HUM_RATIO)
+    return 1.006 * tdb + w * (2501. + 1.86 * tdb)
+
+
+def moist_air_volume(tdb, w, pressure):
+    """Moist air specific volume [m³/kg dry air] (eqn 26)."""
+    w = np.maximum(w, MIN_HUM_RATIO)
+    return psychrolib.R_DA_SI * (np.asarray(tdb, dtype=float) + 273.15) * (1 + 1.607858 * w) / pressure
+
+
+def moist_air_density(tdb, w, pressure):
+    """Moist air density [kg/m³] (eqn 11)."""
+    return (1 + np.maximum(w, MIN_HUM_RATIO)) / moist_air_volume(tdb, w, pressure)
+
+
+# Saturation pressure table for the chart curves. Linear interpolation on a
+# 0.1 °C grid stays within 1e-4 (relative) of the full expression.
+_T_GRID = np.linspace(-10, 60, 701)
+_PSAT   = sat_vapour_pressure(_T_GRID)
+
+
+def _psat_lookup(tdb):
+    """Saturation vapour pressure [Pa] from the table, exact outside its range."""
+    tdb = np.asarray(tdb, dtype=float)
+    if tdb.size and (tdb.min() < _T_GRID[0] or tdb.max() > _T_GRID[-1]):
+        return sat_vapour_pressure(tdb)
+    return np.interp(tdb, _T_GRID, _PSAT)
+
+
+def state_properties(tdb, twb, pressure):
+    """
+    Vectorised equivalent of AirState.__post_init__.
+    Returns (w, rh, h, tdp, density) arrays; states psychrolib would reject
+    (Twb above Tdb, or out of range) get the same fallback values as AirState.
+    """
+    tdb = np.asarray(tdb, dtype=float)
+    twb = np.asarray(twb, dtype=float)
+    bad = ~(np.isfinite(tdb) & np.isfinite(twb) & (twb <= tdb)
+            & (tdb >= -100) & (tdb <= 200) & (twb >= -100))
+    tdb_ok = np.where(bad, 20.0, tdb)
+    twb_ok = np.where(bad, 10.0, twb)
+
+    w       = hum_ratio_from_twb(tdb_ok, twb_ok, pressure)
+    rh      = rh_from_hum_ratio(tdb_ok, w, pressure)
+    h       = moist_air_enthalpy(tdb_ok, w)
+    tdp     = tdp_from_hum_ratio(tdb_ok, w, pressure)
+    density = 1.0 / moist_air_volume(tdb_ok, w, pressure)
+
+    return (np.where(bad, 0.0, w), np.where(bad, 0.0, rh),
+            np.where(bad, tdb * 1.006, h), np.where(bad, tdb - 2, tdp),
+            np.where(bad, 1.2, density))
+
 
+@lru_cache(maxsize=32)
 def altitude_to_pressure(altitude_m: float) -> float:
     """Convert altitude [m] to atmospheric pressure [Pa] using standard atmosphere."""
     return 101325 * (1 - 2.25577e-5 * altitude_m) ** 5.25588
@@ -57,42 +265,24 @@ def altitude_to_pressure(altitude_m: float) -> float:
 def saturation_curve(pressure: float, tdb_min=-10, tdb_max=55, n=300):
     """Generate saturation curve (RH=100%) data for psychrometric chart."""
     temps = np.linspace(tdb_min, tdb_max, n)
-    w_sat = []
-    for t in temps:
-        try:
-            w = psychrolib.GetSatHumRatio(t, pressure)
-            w_sat.append(w * 1000)  # g/kg
-        except Exception:
-            w_sat.append(None)
+    w_sat = _hum_ratio_from_vap_pres(_psat_lookup(temps), pressure) * 1000  # g/kg
     return temps, w_sat
 
 
 def rh_curve(rh: float, pressure: float, tdb_min=-10, tdb_max=55, n=200):
-    """Generate constant RH line data."""
+    """Generate constant RH line data. Pass rh as a column array (k, 1) to get
+    k curves on the shared temperature grid as a (k, n) array."""
     temps = np.linspace(tdb_min, tdb_max, n)
-    w_rh = []
-    for t in temps:
-        try:
-            w = psychrolib.GetHumRatioFromRelHum(t, rh, pressure)
-            w_rh.append(w * 1000)
-        except Exception:
-            w_rh.append(None)
+    w_rh = _hum_ratio_from_vap_pres(rh * _psat_lookup(temps), pressure) * 1000
     return temps, w_rh
 
 
 def enthalpy_line(h_kj: float, pressure: float, tdb_min=-10, tdb_max=55, n=100):
-    """Generate constant enthalpy line: W = (h - 1.006*T) / (2501 + 1.86*T) in g/kg."""
+    """Generate constant enthalpy line: W = (h - 1.006*T) / (2501 + 1.86*T) in g/kg.
+    h_kj broadcasts against the temperature grid like rh in rh_curve."""
     temps = np.linspace(tdb_min, tdb_max, n)
-    w_h = []
-    for t in temps:
-        try:
-            w = (h_kj - 1.006 * t) / (2501 + 1.86 * t)
-            if 0 <= w <= 0.040:
-                w_h.append(w * 1000)
-            else:
-                w_h.append(None)
-        except Exception:
-            w_h.append(None)
+    w = (h_kj - 1.006 * temps) / (2501 + 1.86 * temps)
+    w_h = np.where((w >= 0) & (w <= 0.040), w * 1000, np.nan)
     return temps, w_h
 
 
@@ -101,14 +291,6 @@ def wb_line(twb: float, pressure: float, tdb_min: float = None, tdb_max=55, n=10
     if tdb_min is None:
         tdb_min = twb
     temps = np.linspace(tdb_min, tdb_max, n)
-    w_wb = []
-    for t in temps:
-        try:
-            w = psychrolib.GetHumRatioFromTWetBulb(t, twb, pressure)
-            if w >= 0:
-                w_wb.append(w * 1000)
-            else:
-                w_wb.append(None)
-        except Exception:
-            w_wb.append(None)
+    w = hum_ratio_from_twb(temps, twb, pressure)
+    w_wb = np.where(temps >= twb, w * 1000, np.nan)  # wet bulb cannot exceed dry bulb
     return temps, w_wb
@@ -16,6 +16,7 @@ Formulas verified against AHU_Design.xlsx:
 import psychrolib
 import numpy as np
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 psychrolib.SetUnitSystem(psychrolib.SI)
@@ -33,20 +34,77 @@ ASHRAE_A1 = {       # Fixed ASHRAE 2021 A1 zone corners — never user inputs
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+def _h_sat(t, P):
+    """Saturated moist air enthalpy [kJ/kg] at Tdb t."""
+    return psychrolib.GetMoistAirEnthalpy(t, psychrolib.GetSatHumRatio(t, P)) / 1000
+
+
+# Seed table for _sat_tdb_for_enthalpy: h_sat over the 0-30 °C search range at
+# sea level. Only a starting point, so the pressure it was built at is immaterial.
+_T_SEED = np.arange(0.0, 31.0)
+_H_SEED = np.array([_h_sat(t, 101325.0) for t in _T_SEED])
+
+
+@lru_cache(maxsize=32)
+def _h_sat_bracket(P):
+    """h_sat at the 0 and 30 °C ends of the _sat_tdb_for_enthalpy search range."""
+    return _h_sat(0.0, P), _h_sat(30.0, P)
+
+
 def _sat_tdb_for_enthalpy(target_h_kJ: float, P: float) -> float:
-    """Find saturated Tdb such that h_sat = target_h_kJ [kJ/kg]."""
-    from scipy.optimize import brentq
-    def err(t):
-        w = psychrolib.GetSatHumRatio(t, P)
-        return psychrolib.GetMoistAirEnthalpy(t, w) / 1000 - target_h_kJ
-    try:
-        return round(brentq(err, 0.0, 30.0, xtol=0.01), 2)
-    except Exception:
+    """Find saturated Tdb such that h_sat = target_h_kJ [kJ/kg].
+    Newton's method from a tabulated seed; bisection over 0-30 °C if it does
+    not settle inside that range."""
+    # h_sat rises monotonically with Tdb, so a target outside the end values
+    # has no root in range (NaN fails the test as well)
+    h_lo, h_hi = _h_sat_bracket(P)
+    if not h_lo <= target_h_kJ <= h_hi:
         return 14.55  # fallback to typical value
 
+    t = float(np.interp(target_h_kJ, _H_SEED, _T_SEED))
+    for _ in range(6):
+        err = _h_sat(t, P) - target_h_kJ
+        if abs(err) < 1e-4:
+            if 0.0 <= t <= 30.0:
+                return round(t, 2)
+            break
+        slope = (_h_sat(t + 0.01, P) - target_h_kJ - err) / 0.01
+        t -= err / slope
+
+    lo, hi = 0.0, 30.0
+    err_lo = h_lo - target_h_kJ
+    while hi - lo > 0.01:
+        mid = (lo + hi) / 2
+        err_mid = _h_sat(mid, P) - target_h_kJ
+        if (err_mid > 0) == (err_lo > 0):
+            lo, err_lo = mid, err_mid
+        else:
+            hi = mid
+    return round((lo + hi) / 2, 2)
+
+
+@lru_cache(maxsize=256)
+def _w(tdb, twb, P):
+    """Humidity ratio [kg/kg] from Tdb/Twb. The same states recur across
+    derive_off_coil, compute_system_flows and the processes, and across reruns."""
+    if tdb == twb:  # saturated (all derived off-coil states): W = Ws(Tdb)
+        return psychrolib.GetSatHumRatio(tdb, P)
+    return psychrolib.GetHumRatioFromTWetBulb(tdb, twb, P)
+
+
+@lru_cache(maxsize=64)
+def _state(tdb, twb, P):
+    """(W [kg/kg], h [kJ/kg], rho [kg/m³]) at Tdb/Twb. Processes share end
+    states (both winter processes finish at OC Heat), so each is built once."""
+    w = _w(tdb, twb, P)
+    return (w, psychrolib.GetMoistAirEnthalpy(tdb, w) / 1000,
+            psychrolib.GetMoistAirDensity(tdb, w, P))
+
 
 def _tdp(tdb, twb, P):
-    w = psychrolib.GetHumRatioFromTWetBulb(tdb, twb, P)
+    if tdb == twb:  # saturated: dew point equals wet bulb, no iteration needed
+        return twb
+    w = _w(tdb, twb, P)
     return psychrolib.GetTDewPointFromHumRatio(tdb, w, P)
 
 
@@ -55,13 +113,11 @@ def _twb_from_tdb_w(tdb, w, P):
 
 
 def _rho(tdb, twb, P):
-    w = psychrolib.GetHumRatioFromTWetBulb(tdb, twb, P)
-    return psychrolib.GetMoistAirDensity(tdb, w, P)
+    return _state(tdb, twb, P)[2]
 
 
 def _h(tdb, twb, P):
-    w = psychrolib.GetHumRatioFromTWetBulb(tdb, twb, P)
-    return psychrolib.GetMoistAirEnthalpy(tdb, w, P) / 1000  # kJ/kg
+    return _state(tdb, twb, P)[1]  # kJ/kg
 
 
 # ── Derived off-coil conditions ───────────────────────────────────────────────
@@ -98,7 +154,7 @@ def derive_off_coil(
 
     # 4. OC Heat for humidification — sensible heat to CRAH on-coil Tdb,
     #    humidity ratio preserved from winter OA (sensible process, W = const)
-    w_winter = psychrolib.GetHumRatioFromTWetBulb(oat_min_oah_tdb, oat_min_oah_twb, P)
+    w_winter = _w(oat_min_oah_tdb, oat_min_oah_twb, P)
     oc_heat_tdb = crah_on_tdb
     oc_heat_twb = round(_twb_from_tdb_w(crah_on_tdb, w_winter, P), 2)
 
@@ -121,7 +177,7 @@ def derive_off_coil(
 
 # ── Airflow & system calculations ─────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SystemFlows:
     ahu_vol_flow: float    # m³/s — AHU DOAS volume flow
     ahu_mdot_out: float    # kg/s — AHU mass flow at off-coil density
@@ -170,7 +226,7 @@ def compute_system_flows(
     crah_vol     = crah_mdot / rho_crah_avg
 
     # AHU DOAS flows
-    rho_ahu_out  = _rho(oc_dehum_tdb, oc_dehum_twb, P)
+    oc_dehum_w, _, rho_ahu_out = _state(oc_dehum_tdb, oc_dehum_twb, P)
 
     if ahu_vol_flow_override and ahu_vol_flow_override > 0:
         ahu_vol = ahu_vol_flow_override
@@ -182,7 +238,6 @@ def compute_system_flows(
 
     # D19: fan delta-T = fan_kW / (ahu_vol_flow * Cp_off_coil)
     # Excel formula: =D18/(D15*M37) — uses vol flow and Cp of off-coil state
-    oc_dehum_w  = psychrolib.GetHumRatioFromTWetBulb(oc_dehum_tdb, oc_dehum_twb, P)
     Cp_oc       = 1.006 + 1.86 * oc_dehum_w  # Cp at off-coil state
     ahu_vol_fan = ahu_vol_flow_override if ahu_vol_flow_override else ahu_vol
     fan_delta_t = fan_load / (ahu_vol_fan * Cp_oc) if ahu_vol_fan > 0 else 0
@@ -200,7 +255,7 @@ def compute_system_flows(
 
 # ── Process heat calculations (Section 4) ─────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Process:
     name:     str
     state_in: str
@@ -232,17 +287,11 @@ def _process(name, state_in, state_out,
       J     = K - I                                      [kW latent]
       L     = I / K                                      [SHR]
     """
-    w_in_kg  = psychrolib.GetHumRatioFromTWetBulb(tdb_in,  twb_in,  P)  # kg/kg
-    w_out_kg = psychrolib.GetHumRatioFromTWetBulb(tdb_out, twb_out, P)
+    w_in_kg,  h_in,  rho_in  = _state(tdb_in,  twb_in,  P)  # kg/kg, kJ/kg, kg/m³
+    w_out_kg, h_out, rho_out = _state(tdb_out, twb_out, P)
     w_in     = w_in_kg  * 1000  # g/kg
     w_out    = w_out_kg * 1000
 
-    h_in   = psychrolib.GetMoistAirEnthalpy(tdb_in,  w_in_kg)  / 1000  # kJ/kg
-    h_out  = psychrolib.GetMoistAirEnthalpy(tdb_out, w_out_kg) / 1000
-
-    rho_in  = psychrolib.GetMoistAirDensity(tdb_in,  w_in_kg,  P)
-    rho_out = psychrolib.GetMoistAirDensity(tdb_out, w_out_kg, P)
-
     mdot_in  = vol_flow * rho_in
     mdot_out = vol_flow * rho_out
 
@@ -265,7 +314,7 @@ def _process(name, state_in, state_out,
         moisture=round(moisture,3),
         Q_sens=round(Q_sens,2), Q_lat=round(Q_lat,2),
         Q_total=round(Q_total,2),
-        SHR=round(SHR,4) if not np.isnan(SHR) else None,
+        SHR=None if SHR != SHR else round(SHR,4),  # SHR != SHR only for NaN
     )
 
 
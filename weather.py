@@ -165,8 +165,12 @@ DESIGN_CONDITIONS: Dict[str, DesignConditions] = {
 }
 
 
+# The table is static, so the sorted location list is built once at import
+_LOCATIONS = sorted([k for k in DESIGN_CONDITIONS.keys() if k != "CUSTOM"]) + ["CUSTOM"]
+
+
 def get_location_list():
-    return sorted([k for k in DESIGN_CONDITIONS.keys() if k != "CUSTOM"]) + ["CUSTOM"]
+    return list(_LOCATIONS)
 
 
 def get_design_conditions(location_name: str) -> Optional[DesignConditions]:
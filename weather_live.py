@@ -4,7 +4,7 @@ weather_live.py — Live ASHRAE-equivalent design conditions from Open-Meteo ERA
 Pipeline:
   1. Geocode city string → lat, lon, elevation (Open-Meteo Geocoding API, free)
   2. Pull 10 years of hourly Tdb + Tdp ERA5 reanalysis (Open-Meteo Archive API, free)
-  3. Compute WB from Tdp via psychrolib
+  3. Compute WB from Tdp via the vectorised psychrolib ports in psychro.py
   4. Derive ASHRAE-style percentiles:
        Summer: 99.6% Tdb  + coincident WB   (≈ ASHRAE N=20 / 0.4% cooling)
                99.0% Tdb  + coincident WB   (≈ ASHRAE 1%   / N=50)
@@ -17,23 +17,43 @@ No API key required. Free for non-commercial use. Data: ERA5 / ECMWF via Open-Me
 
 import requests
 import numpy as np
-import psychrolib
 import urllib3
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from dataclasses import dataclass
 
 # Suppress SSL warnings from corporate proxy certificate inspection
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-psychrolib.SetUnitSystem(psychrolib.SI)
-
 GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
 ARCHIVE_URL   = "https://archive-api.open-meteo.com/v1/archive"
 
 # How many years of ERA5 data to pull for percentile calculation
 HISTORY_YEARS = 10
 
+# Responses are cached on disk (in the temp dir), so fetching the same city
+# again skips the multi-MB ERA5 download. The archive end date moves daily,
+# so ERA5 entries only need to live a day; geocoding results change rarely.
+# The HTTP clients take a few hundred ms to import, so they are built on
+# first use rather than when this module is imported.
+@lru_cache(maxsize=1)
+def _session():
+    import requests_cache
+    return requests_cache.CachedSession(
+        "ahu_weather_cache", use_temp=True,
+        expire_after=timedelta(days=1),
+        urls_expire_after={"geocoding-api.open-meteo.com": timedelta(days=7)},
+    )
+
+
+# Archive data comes back as FlatBuffers: packed float32 arrays instead of a
+# multi-MB JSON document
+@lru_cache(maxsize=1)
+def _client():
+    import openmeteo_requests
+    return openmeteo_requests.Client(session=_session())
+
 
 @dataclass
 class LiveDesignConditions:
@@ -64,16 +84,31 @@ class LiveDesignConditions:
     source: str = "Open-Meteo ERA5 Reanalysis"
 
 
-def _tdp_to_twb(tdb: float, tdp: float, pressure: float) -> float:
-    """Convert dew point to wet bulb via psychrolib."""
-    try:
-        w = psychrolib.GetHumRatioFromTDewPoint(tdp, pressure)
-        return psychrolib.GetTWetBulbFromHumRatio(tdb, w, pressure)
-    except Exception:
-        # Approximation fallback: Stull 2011
-        return tdb * np.arctan(0.151977 * (tdp + 8.313659)**0.5) + \
-               np.arctan(tdb + tdp) - np.arctan(tdp - 1.676331) + \
-               0.00391838 * tdp**1.5 * np.arctan(0.023101 * tdp) - 4.686035
+def _stull_twb(tdb: np.ndarray, tdp: np.ndarray) -> np.ndarray:
+    """Approximation fallback: Stull 2011, evaluated over whole arrays."""
+    return (tdb * np.arctan(0.151977 * np.sqrt(tdp + 8.313659))
+            + np.arctan(tdb + tdp) - np.arctan(tdp - 1.676331)
+            + 0.00391838 * tdp * np.sqrt(tdp) * np.arctan(0.023101 * tdp) - 4.686035)
+
+
+def _tdp_to_twb(tdb: np.ndarray, tdp: np.ndarray, pressure: float) -> np.ndarray:
+    """Convert hourly dew points to wet bulbs with the vectorised psychrolib
+    ports, in one pass over the whole record."""
+    from psychro import sat_hum_ratio, twb_from_hum_ratio
+    tdb, tdp = np.broadcast_arrays(np.asarray(tdb, dtype=float), np.asarray(tdp, dtype=float))
+    shape = tdb.shape
+    # ERA5 reports 0.1 °C steps, so many hours share the same (Tdb, Tdp) pair;
+    # each distinct pair is solved once and the results scattered back
+    _, first, inverse = np.unique(np.ravel(tdb + 1j * tdp), return_index=True,
+                                  return_inverse=True)
+    tdb, tdp = tdb.ravel()[first], tdp.ravel()[first]
+    # psychrolib only solves -100..200 °C; anything else takes the fallback
+    ok  = (tdb >= -100) & (tdb <= 200) & (tdp >= -100) & (tdp <= 200)
+    twb = np.empty_like(tdb)
+    twb[ok] = twb_from_hum_ratio(tdb[ok], sat_hum_ratio(tdp[ok], pressure), pressure)
+    twb[~ok] = _stull_twb(tdb[~ok], tdp[~ok])
+    twb = twb[inverse.ravel()].reshape(shape)
+    return twb.item() if twb.ndim == 0 else twb
 
 
 def geocode(city: str) -> Optional[dict]:
@@ -82,7 +117,7 @@ def geocode(city: str) -> Optional[dict]:
     Returns dict with: name, country, latitude, longitude, elevation
     """
     try:
-        r = requests.get(GEOCODING_URL, params={
+        r = _session().get(GEOCODING_URL, params={
             "name": city,
             "count": 5,
             "language": "en",
@@ -115,7 +150,7 @@ def fetch_era5_hourly(lat: float, lon: float, years: int = HISTORY_YEARS) -> dic
     start_date = end_date.replace(year=end_date.year - years)
 
     try:
-        r = requests.get(ARCHIVE_URL, params={
+        responses = _client().weather_api(ARCHIVE_URL, params={
             "latitude"        : round(lat, 4),
             "longitude"       : round(lon, 4),
             "start_date"      : start_date.isoformat(),
@@ -124,12 +159,15 @@ def fetch_era5_hourly(lat: float, lon: float, years: int = HISTORY_YEARS) -> dic
             "timezone"        : "UTC",
             "wind_speed_unit" : "ms",
         }, timeout=60, verify=False)
-        r.raise_for_status()
-        data = r.json()
 
-        hourly = data.get("hourly", {})
-        tdb = np.array(hourly.get("temperature_2m", []), dtype=float)
-        tdp = np.array(hourly.get("dew_point_2m",   []), dtype=float)
+        # Variables arrive in the order requested. ERA5 is published to 0.1 °C,
+        # so rounding the float32 values gives back exactly the JSON figures.
+        # The widening cast is the only copy; rounding happens in place.
+        hourly = responses[0].Hourly()
+        tdb = hourly.Variables(0).ValuesAsNumpy().astype(float)
+        tdp = hourly.Variables(1).ValuesAsNumpy().astype(float)
+        np.round(tdb, 1, out=tdb)
+        np.round(tdp, 1, out=tdp)
 
         # Remove NaN rows
         valid = ~(np.isnan(tdb) | np.isnan(tdp))
@@ -143,9 +181,10 @@ def fetch_era5_hourly(lat: float, lon: float, years: int = HISTORY_YEARS) -> dic
         return {"tdb": tdb, "tdp": tdp, "years": actual_years,
                 "start": start_date.isoformat(), "end": end_date.isoformat()}
 
-    except requests.exceptions.Timeout:
-        raise RuntimeError("ERA5 request timed out — try again")
     except Exception as e:
+        # The Open-Meteo client wraps transport errors, so check the cause too
+        if isinstance(e, requests.exceptions.Timeout) or isinstance(e.__cause__, requests.exceptions.Timeout):
+            raise RuntimeError("ERA5 request timed out — try again")
         raise RuntimeError(f"ERA5 fetch failed: {e}")
 
 
@@ -164,22 +203,32 @@ def compute_design_conditions(lat: float, lon: float, altitude_m: float,
     tdp  = era5["tdp"]
     n    = len(tdb)
 
-    # ── Compute WB for all hours ──────────────────────────────────────────
-    twb = np.array([_tdp_to_twb(t, d, P) for t, d in zip(tdb, tdp)])
-
     # ── Percentile thresholds ─────────────────────────────────────────────
     # ASHRAE uses annual hours: 8760h/yr
     # 0.4% exceedance = 99.6th percentile of annual distribution
     # We compute over all hours in the dataset
 
+    # All four Tdb percentiles from one partition of the record
+    p_heat_004, p_heat_010, p_cool_990, p_cool_996 = np.percentile(tdb, [0.4, 1.0, 99.0, 99.6])
+
+    # ── Compute WB for the hours the statistics read ──────────────────────
+    # Tdp <= Twb <= Tdb, so only hours whose Tdb reaches the Tdp at the 99.6%
+    # rank (one rank and 0.01 °C of slack) can set the 99.6% WB. Together with
+    # the hot and cold coincident hours that is a few % of the record; the
+    # rest stay at -inf, below every real WB.
+    k         = max(int(0.996 * (n - 1)) - 1, 0)
+    tdp_k     = np.partition(tdp, k)[k]
+    need      = (tdb >= tdp_k - 0.01) | (tdb >= p_cool_990 - 1.0) | (tdb <= p_heat_004 + 1.0)
+    twb       = np.full(n, -np.inf)
+    twb[need] = _tdp_to_twb(tdb[need], tdp[need], P)
+
     # --- Summer cooling: high Tdb percentiles ---
-    p_cool_996 = np.percentile(tdb, 99.6)   # 0.4% cooling DB
-    p_cool_990 = np.percentile(tdb, 99.0)   # 1.0% cooling DB
+    # p_cool_996: 0.4% cooling DB, p_cool_990: 1.0% cooling DB
 
     # Coincident WB: mean WB when Tdb is within 0.5°C of the design DB
     def coincident_wb(db_threshold: float, tdb_arr, twb_arr, window=1.0) -> float:
         mask = tdb_arr >= (db_threshold - window)
-        if mask.sum() == 0:
+        if not mask.any():
             return db_threshold - 5
         return float(np.mean(twb_arr[mask]))
 
@@ -188,16 +237,18 @@ def compute_design_conditions(lat: float, lon: float, altitude_m: float,
 
     # --- Summer dehumidification: high WB percentiles ---
     p_dehum_996 = np.percentile(twb, 99.6)
+    extra       = ~need & (tdb >= p_dehum_996 - 0.5)  # may reach the window below
+    if extra.any():
+        twb[extra] = _tdp_to_twb(tdb[extra], tdp[extra], P)
     mask_wb     = twb >= (p_dehum_996 - 0.5)
-    db_at_wb996 = float(np.mean(tdb[mask_wb])) if mask_wb.sum() > 0 else p_dehum_996 + 3
+    db_at_wb996 = float(np.mean(tdb[mask_wb])) if mask_wb.any() else p_dehum_996 + 3
 
     # --- Winter heating: low Tdb percentiles ---
-    p_heat_004 = np.percentile(tdb, 0.4)    # 99.6% heating DB
-    p_heat_010 = np.percentile(tdb, 1.0)    # 99.0% heating DB
+    # p_heat_004: 99.6% heating DB, p_heat_010: 99.0% heating DB
 
     # Mean coincident WB in cold conditions
     mask_cold  = tdb <= (p_heat_004 + 1.0)
-    wb_winter  = float(np.mean(twb[mask_cold])) if mask_cold.sum() > 0 else p_heat_004 - 2
+    wb_winter  = float(np.mean(twb[mask_cold])) if mask_cold.any() else p_heat_004 - 2
 
     return LiveDesignConditions(
         location_name  = location_name,